@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Async API - asyncio wrappers for search and design system generation
+
+Usage:
+    from async_search import asearch, asearch_stack, agenerate_design_system
+    result = await asearch("glassmorphism", "style")
+    results = await asyncio.gather(*(asearch(q) for q in queries))
+    text = await agenerate_design_system("SaaS dashboard", "My Project")
+
+Scoring runs in one bounded thread pool (ASYNC_WORKERS threads) so the event loop
+never blocks; threads share the process-wide index registry, so each index is
+loaded once. Requests submitted in the same loop iteration go to the pool as one
+job (up to ASYNC_BATCH_SIZE). Identical requests already in flight on the same
+loop are coalesced: the work runs once and every caller gets its own copy.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import core
+from core import MAX_RESULTS
+
+# ============ CONFIGURATION ============
+ASYNC_WORKERS = int(os.environ.get("UI_UX_ASYNC_WORKERS", "4"))
+ASYNC_BATCH_SIZE = 64  # requests handed to one pool job
+
+core.prefer_memory_query_cache()  # an event-loop host is long-lived
+
+
+# ============ EXECUTOR ============
+class _State:
+    executor = None
+    lock = threading.Lock()
+    # loop -> _LoopState; coalescing and batching happen within one event loop
+    loops = weakref.WeakKeyDictionary()
+    executed = 0
+    coalesced = 0
+
+
+class _LoopState:
+    def __init__(self):
+        self.inflight = {}  # request key -> future
+        self.pending = []   # (future, call) waiting for the next flush
+        self.scheduled = False
+
+
+def _executor():
+    with _State.lock:
+        if _State.executor is None:
+            _State.executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="uiux-search")
+        return _State.executor
+
+
+def set_max_workers(workers):
+    """Resize the pool; running jobs finish on the old one"""
+    global ASYNC_WORKERS
+    with _State.lock:
+        ASYNC_WORKERS = workers
+        old, _State.executor = _State.executor, None
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def async_stats():
+    """Executed vs coalesced request counters"""
+    return {"executed": _State.executed, "coalesced": _State.coalesced, "workers": ASYNC_WORKERS}
+
+
+def _copy(result):
+    """Private copy of a search result for a coalesced caller (strings are immutable)"""
+    if isinstance(result, dict):
+        result = dict(result)
+        if isinstance(result.get("results"), list):
+            result["results"] = [dict(row) for row in result["results"]]
+    return result
+
+
+def _call_all(calls):
+    """Pool job: run a batch of calls, capturing each outcome"""
+    outcomes = []
+    for call in calls:
+        try:
+            outcomes.append((True, call()))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
+
+
+def _deliver(futures, job):
+    if job.cancelled() or job.exception() is not None:
+        for future in futures:
+            if not future.done():
+                if job.cancelled():
+                    future.cancel()
+                else:
+                    future.set_exception(job.exception())
+        return
+    for future, (ok, value) in zip(futures, job.result()):
+        if not future.done():
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+def _flush(loop, state):
+    """Hand everything submitted since the last loop iteration to the pool
+
+    A search takes well under a millisecond, so one pool job per request would be
+    dominated by thread hand-off; batching keeps the pool busy with real work.
+    """
+    state.scheduled = False
+    pending, state.pending = state.pending, []
+    for start in range(0, len(pending), ASYNC_BATCH_SIZE):
+        chunk = pending[start:start + ASYNC_BATCH_SIZE]
+        job = loop.run_in_executor(_executor(), _call_all, [call for _, call in chunk])
+        job.add_done_callback(partial(_deliver, [future for future, _ in chunk]))
+
+
+async def _run(key, fn, *args, **kwargs):
+    """Run fn in the pool once per distinct in-flight key"""
+    loop = asyncio.get_running_loop()
+    state = _State.loops.get(loop)
+    if state is None:
+        state = _State.loops[loop] = _LoopState()
+
+    future = state.inflight.get(key)
+    if future is not None:
+        _State.coalesced += 1
+        # shield: one caller being cancelled must not cancel the shared work
+        return _copy(await asyncio.shield(future))
+
+    future = loop.create_future()
+    state.inflight[key] = future
+    future.add_done_callback(lambda _: state.inflight.pop(key, None))
+    state.pending.append((future, partial(fn, *args, **kwargs)))
+    if not state.scheduled:
+        state.scheduled = True
+        loop.call_soon(_flush, loop, state)
+    _State.executed += 1
+    return _copy(await asyncio.shield(future))
+
+
+# ============ ASYNC API ============
+def _filters_key(filters):
+    """Hashable form of a filters dict for the in-flight key"""
+    if not filters:
+        return None
+    return tuple(sorted((column, (values,) if isinstance(values, str) else tuple(values))
+                        for column, values in filters.items()))
+
+
+async def asearch(query, domain=None, max_results=MAX_RESULTS, by_score=False, backend=None, fuzzy=False,
+                  partial=False, filters=None):
+    """Async core.search()"""
+    return await _run(("search", query, domain, max_results, by_score, backend, fuzzy, partial, _filters_key(filters)),
+                      core.search, query, domain, max_results, by_score=by_score, backend=backend, fuzzy=fuzzy,
+                      partial=partial, filters=filters)
+
+
+async def asearch_stack(query, stack, max_results=MAX_RESULTS, backend=None, fuzzy=False, partial=False, filters=None):
+    """Async core.search_stack()"""
+    return await _run(("search_stack", query, stack, max_results, backend, fuzzy, partial, _filters_key(filters)),
+                      core.search_stack, query, stack, max_results, backend=backend, fuzzy=fuzzy, partial=partial,
+                      filters=filters)
+
+
+async def asearch_all(query, max_results=MAX_RESULTS, fuzzy=False, partial=False):
+    """Async core.search_all()"""
+    return await _run(("search_all", query, max_results, fuzzy, partial), core.search_all, query, max_results,
+                      fuzzy=fuzzy, partial=partial)
+
+
+async def agenerate_design_system(query, project_name=None, output_format="ascii",
+                                  persist=False, page=None, output_dir=None, generator=None):
+    """Async design_system.generate_design_system() with per-domain searches run concurrently
+
+    The product search decides the style priority, so it starts together with the
+    color, landing and typography searches and only the style search waits for it.
+    Output is identical to the synchronous generator.
+    """
+    from design_system import DesignSystemGenerator, format_ascii_box, format_markdown, persist_design_system
+
+    loop = asyncio.get_running_loop()
+    if generator is None:
+        generator = await loop.run_in_executor(_executor(), DesignSystemGenerator)
+
+    domain_queries = generator.domain_queries(query)
+    product_task = asyncio.ensure_future(asearch(query, "product", 1))
+    other_tasks = {domain: asyncio.ensure_future(asearch(domain_query, domain, max_results))
+                   for domain, (domain_query, max_results) in domain_queries.items()
+                   if domain not in ("product", "style")}
+
+    try:
+        product_result = await product_task
+        category = generator.product_category(product_result)
+        reasoning = generator.reasoning(category)
+        style_query, style_max = generator.domain_queries(query, reasoning.get("style_priority", []))["style"]
+        search_results = {"style": await asearch(style_query, "style", style_max)}
+        for domain, task in other_tasks.items():
+            search_results[domain] = await task
+    except BaseException:
+        for task in [product_task, *other_tasks.values()]:
+            task.cancel()
+        raise
+    search_results["product"] = product_result
+    design_system = generator.build(query, project_name, category, reasoning, search_results)
+
+    if persist:
+        await loop.run_in_executor(_executor(), persist_design_system, design_system, page, output_dir, query)
+    if output_format == "markdown":
+        return format_markdown(design_system)
+    return format_ascii_box(design_system)
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Bundle - compiled, memory-mapped binary bundle of all datasets
+
+Usage:
+    python search.py --build-bundle                 # compile data/ into .index/datasets.bundle
+    python bundle.py [--data-dir DIR] [--extra-dir DIR ...] [--output FILE]
+
+Layout (native byte order, recorded in the header):
+    magic "UIUXBNDL" | version u32 | byteorder u32 | toc length u64 | toc (pickle) | sections
+
+Besides the data dir, the bundle can compile other data dirs (--extra-dir), so
+core serves whichever DATA_DIR it points at from the same file. The table of
+contents has one root per data dir, keyed by its path relative to the bundle file,
+and maps each CSV of a root (path relative to that data dir) to its source
+fingerprint, columns, BM25 parameters and the (offset, length, typecode) of its
+sections. Every column is a UTF-8 blob plus u32 cell offsets and a null flag per
+row; datasets with a search config also carry the sorted vocabulary, idf, doc
+freqs, per-term max scores, postings (doc ids, tfs, precomputed BM25 weights, token
+positions), doc lengths and doc norms. The federated index (core.search_all) is stored the same
+way, plus the (source, row) of each of its documents.
+
+Sections are exposed as zero-copy memoryviews over the mmap, so opening the bundle
+costs the same for 1 or 23 datasets, and cell text is decoded only when returned.
+Every process that opens the bundle maps the same page-cache pages: N workers
+serving searches share one physical copy of the indexes (the numpy backend wraps
+the same pages with numpy.frombuffer instead of building a per-process matrix).
+"""
+
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from core import (BM25, BM25_BACKEND, BUNDLE_PATH, ColumnStore, CSV_CONFIG, DATA_DIR, STACK_CONFIG,
+                  _STACK_COLS, _federated_sources, _file_fingerprint, _file_hash,
+                  _import_numpy)
+
+# ============ CONFIGURATION ============
+BUNDLE_MAGIC = b"UIUXBNDL"
+BUNDLE_VERSION = 4
+_HEADER = struct.Struct("<8sIIQ")
+_BYTEORDER = {"little": 1, "big": 2}[sys.byteorder]
+
+assert array("I").itemsize == 4 and array("d").itemsize == 8
+
+
+# ============ BUILD ============
+def _search_configs():
+    """Relative CSV path -> (search_cols, output_cols) from core's domain and stack configs"""
+    configs = {config["file"]: (config["search_cols"], config["output_cols"]) for config in CSV_CONFIG.values()}
+    for config in STACK_CONFIG.values():
+        configs[config["file"]] = (_STACK_COLS["search_cols"], _STACK_COLS["output_cols"])
+    return configs
+
+
+class _SectionWriter:
+    """Accumulates 8-byte aligned sections and records their (offset, length, typecode)"""
+
+    def __init__(self):
+        self.body = bytearray()
+
+    def add(self, data, typecode="B"):
+        if len(self.body) % 8:
+            self.body.extend(b"\0" * (8 - len(self.body) % 8))
+        raw = data.tobytes() if isinstance(data, array) else bytes(data)
+        section = (len(self.body), len(raw), typecode)
+        self.body.extend(raw)
+        return section
+
+    def add_strings(self, values):
+        """Write strings as one UTF-8 blob; returns (blob, offsets, nulls) sections"""
+        blob = bytearray()
+        offsets = array("I", [0])
+        nulls = bytearray(len(values))
+        for i, value in enumerate(values):
+            if value is None:
+                nulls[i] = 1
+            else:
+                blob.extend(value.encode("utf-8"))
+            offsets.append(len(blob))
+        return self.add(blob), self.add(offsets, "I"), self.add(nulls)
+
+
+def _compile_bm25(writer, bm25):
+    """Write BM25 statistics; vocabulary sorted by UTF-8 bytes for binary search"""
+    terms = sorted(bm25.postings, key=lambda t: t.encode("utf-8"))
+    idf = array("d", (bm25.idf[t] for t in terms))
+    doc_freqs = array("I", (bm25.doc_freqs[t] for t in terms))
+    max_scores = array("d", (bm25.max_scores[t] for t in terms))
+    post_offsets = array("I", [0])
+    post_docs = array("I")
+    post_tfs = array("I")
+    post_weights = array("d")
+    pos_offsets = array("I", [0])
+    positions = array("I")
+    position_index = bm25._position_index()
+    k1_plus_1 = bm25.k1 + 1
+    for term in terms:
+        doc_ids, tfs = bm25.postings[term]
+        post_docs.extend(doc_ids)
+        post_tfs.extend(tfs)
+        post_offsets.append(len(post_docs))
+        # Same expression as BM25.top_k() / _numpy_matrix(), so weights are bit-identical
+        term_idf = bm25.idf[term]
+        post_weights.extend(term_idf * (tf * k1_plus_1) / (tf + bm25.doc_norms[doc_id])
+                            for doc_id, tf in zip(doc_ids, tfs))
+        for token_positions in position_index[term]:
+            positions.extend(token_positions)
+            pos_offsets.append(len(positions))
+
+    return {
+        "N": bm25.N,
+        "avgdl": bm25.avgdl,
+        "k1": bm25.k1,
+        "b": bm25.b,
+        "vocab": writer.add_strings(terms),
+        "sections": {
+            "idf": writer.add(idf, "d"),
+            "doc_freqs": writer.add(doc_freqs, "I"),
+            "max_scores": writer.add(max_scores, "d"),
+            "post_offsets": writer.add(post_offsets, "I"),
+            "post_docs": writer.add(post_docs, "I"),
+            "post_tfs": writer.add(post_tfs, "I"),
+            "post_weights": writer.add(post_weights, "d"),
+            "pos_offsets": writer.add(pos_offsets, "I"),
+            "positions": writer.add(positions, "I"),
+            "doc_lengths": writer.add(array("I", bm25.doc_lengths), "I"),
+            "doc_norms": writer.add(array("d", bm25.doc_norms), "d")
+        }
+    }
+
+
+def _compile_federated(writer, data_dir, stores):
+    """Write the federated index over every domain and stack, as core._load_federated_index builds it"""
+    sources = _federated_sources(data_dir)
+    source_ids = array("I")
+    rows = array("I")
+    documents = []
+    for source_id, source in enumerate(sources):
+        store = stores[source["file"]]
+        for idx in range(len(store)):
+            source_ids.append(source_id)
+            rows.append(idx)
+            documents.append(store.text(idx, source["search_cols"]))
+    bm25 = BM25()
+    bm25.fit(documents)
+    return {
+        "sources": sources,
+        "fingerprints": [(source["file"], *_file_fingerprint(data_dir / source["file"])) for source in sources],
+        "doc_sources": (writer.add(source_ids, "I"), writer.add(rows, "I")),
+        "bm25": _compile_bm25(writer, bm25)
+    }
+
+
+def _compile_root(writer, data_dir, configs):
+    """Write every CSV under one data dir plus its federated index; returns the root's toc entry"""
+    import csv
+
+    datasets = {}
+    stores = {}
+
+    for filepath in sorted(data_dir.rglob("*.csv")):
+        rel = filepath.relative_to(data_dir).as_posix()
+        with open(filepath, 'r', encoding='utf-8') as f:
+            header = list(dict.fromkeys(next(csv.reader(f), [])))
+        stat = filepath.stat()
+        store = ColumnStore.from_csv(filepath, header)
+
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": _file_hash(filepath),
+            "rows": len(store),
+            "columns": {name: writer.add_strings(store.columns[name]) for name in header},
+            "search_cols": None,
+            "bm25": None
+        }
+        if rel in configs:
+            search_cols = configs[rel][0]
+            bm25 = BM25()
+            bm25.fit([store.text(idx, search_cols) for idx in range(len(store))])
+            entry["search_cols"] = list(search_cols)
+            entry["bm25"] = _compile_bm25(writer, bm25)
+        datasets[rel] = entry
+        stores[rel] = store
+    return {"datasets": datasets, "federated": _compile_federated(writer, data_dir, stores)}
+
+
+def build_bundle(data_dir=DATA_DIR, output=BUNDLE_PATH, extra_dirs=()):
+    """Compile every CSV under data_dir and the existing extra_dirs (rows + BM25 statistics) into one bundle file"""
+    import pickle
+
+    output = Path(output)
+    configs = _search_configs()
+    writer = _SectionWriter()
+    roots = {}
+    for root in [Path(data_dir), *map(Path, extra_dirs)]:
+        key = os.path.relpath(root.resolve(), output.resolve().parent)
+        if root.is_dir() and key not in roots:
+            roots[key] = _compile_root(writer, root, configs)
+
+    toc = pickle.dumps({"roots": roots}, protocol=4)
+    header_len = _HEADER.size + len(toc)
+    padding = (8 - header_len % 8) % 8
+    tmp_path = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, _BYTEORDER, len(toc)))
+        f.write(toc)
+        f.write(b"\0" * padding)
+        f.write(writer.body)
+    os.replace(tmp_path, output)
+    return {"output": str(output), "datasets": sum(len(root["datasets"]) for root in roots.values()),
+            "bytes": header_len + padding + len(writer.body)}
+
+
+# ============ READ ============
+class Bundle:
+    """Read-only view of a bundle file through mmap"""
+
+    def __init__(self, path):
+        import mmap
+        import pickle
+
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mmap)
+        magic, version, byteorder, toc_len = _HEADER.unpack_from(self.mmap, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION or byteorder != _BYTEORDER:
+            raise ValueError(f"Incompatible bundle: {path}")
+        self.toc = pickle.loads(self.view[_HEADER.size:_HEADER.size + toc_len])
+        header_len = _HEADER.size + toc_len
+        self.body_offset = header_len + (8 - header_len % 8) % 8
+        base = Path(path).resolve().parent
+        self.roots = {str((base / key).resolve()): root for key, root in self.toc["roots"].items()}
+
+    def section(self, section):
+        """Zero-copy memoryview of a section, cast to its typecode"""
+        offset, length, typecode = section
+        start = self.body_offset + offset
+        view = self.view[start:start + length]
+        return view if typecode == "B" else view.cast(typecode)
+
+    def _root(self, data_dir):
+        return self.roots.get(str(Path(data_dir).resolve()), {"datasets": {}, "federated": None})
+
+    def dataset(self, data_dir, rel):
+        return self._root(data_dir)["datasets"].get(rel)
+
+    def store(self, data_dir, rel):
+        return BundleStore(self, self.dataset(data_dir, rel))
+
+    def bm25(self, data_dir, rel):
+        return BundleBM25(self, self.dataset(data_dir, rel)["bm25"])
+
+    def federated(self, data_dir, sources, fingerprints):
+        """(sources, doc_sources, stores, bm25) of the federated index, None when it is not up to date"""
+        entry = self._root(data_dir)["federated"]
+        if entry is None or entry["sources"] != sources or entry["fingerprints"] != fingerprints:
+            return None
+        stores = [self.store(data_dir, source["file"]) for source in entry["sources"]]
+        return entry["sources"], _DocSources(self, entry["doc_sources"]), stores, BundleBM25(self, entry["bm25"])
+
+
+class _DocSources:
+    """Federated doc id -> (source position, row) over two u32 sections"""
+
+    def __init__(self, bundle, sections):
+        self.source_ids = bundle.section(sections[0])
+        self.rows = bundle.section(sections[1])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, idx):
+        return self.source_ids[idx], self.rows[idx]
+
+
+class _Strings:
+    """Lazily decoded string column: blob + u32 offsets + null flags"""
+
+    def __init__(self, bundle, sections):
+        blob, offsets, nulls = sections
+        self.blob = bundle.section(blob)
+        self.offsets = bundle.section(offsets)
+        self.nulls = bundle.section(nulls)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def raw(self, idx):
+        return self.blob[self.offsets[idx]:self.offsets[idx + 1]]
+
+    def __getitem__(self, idx):
+        if self.nulls[idx]:
+            return None
+        return str(self.raw(idx), "utf-8")
+
+
+class BundleStore:
+    """ColumnStore-compatible row access backed by a bundle; cells decoded on demand"""
+
+    def __init__(self, bundle, entry):
+        self.size = entry["rows"]
+        self.columns = {name: _Strings(bundle, sections) for name, sections in entry["columns"].items()}
+
+    def __len__(self):
+        return self.size
+
+    def text(self, idx, cols):
+        return " ".join(str(self.columns[col][idx]) if col in self.columns else "" for col in cols)
+
+    def row(self, idx, cols):
+        return {col: self.columns[col][idx] for col in cols if col in self.columns}
+
+
+class _Vocabulary:
+    """Sorted vocabulary with binary-search term -> id lookup (memoized per term)"""
+
+    def __init__(self, terms):
+        self.terms = terms
+        self.ids = {}
+
+    def lookup(self, term):
+        term_id = self.ids.get(term)
+        if term_id is None:
+            key = term.encode("utf-8")
+            lo, hi = 0, len(self.terms)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if bytes(self.terms.raw(mid)) < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            term_id = lo if lo < len(self.terms) and bytes(self.terms.raw(lo)) == key else -1
+            self.ids[term] = term_id
+        return term_id
+
+    def __iter__(self):
+        return (self.terms[i] for i in range(len(self.terms)))
+
+
+class _TermMap:
+    """Read-only mapping term -> value over a vocabulary, as used by BM25's dicts"""
+
+    def __init__(self, vocabulary, value):
+        self.vocabulary = vocabulary
+        self.value = value
+
+    def get(self, term, default=None):
+        term_id = self.vocabulary.lookup(term)
+        return default if term_id < 0 else self.value(term_id)
+
+    def __getitem__(self, term):
+        term_id = self.vocabulary.lookup(term)
+        if term_id < 0:
+            raise KeyError(term)
+        return self.value(term_id)
+
+    def __contains__(self, term):
+        return self.vocabulary.lookup(term) >= 0
+
+    def term_id(self, term):
+        """Position of term in the vocabulary (and its sections), None when absent"""
+        term_id = self.vocabulary.lookup(term)
+        return None if term_id < 0 else term_id
+
+    def __iter__(self):
+        return iter(self.vocabulary)
+
+    def __len__(self):
+        return len(self.vocabulary.terms)
+
+    def items(self):
+        return ((term, self.value(i)) for i, term in enumerate(self.vocabulary))
+
+
+class BundleBM25(BM25):
+    """BM25 whose statistics and postings are memoryviews into a bundle
+
+    score()/top_k()/score_batch() run unchanged on top of these structures; the
+    tokenized corpus is not stored, so fit() rebuilds a regular in-memory index.
+    """
+
+    def __init__(self, bundle, stats):
+        super().__init__(k1=stats["k1"], b=stats["b"])
+        sections = {name: bundle.section(section) for name, section in stats["sections"].items()}
+        vocabulary = _Vocabulary(_Strings(bundle, stats["vocab"]))
+        post_offsets, post_docs, post_tfs = sections["post_offsets"], sections["post_docs"], sections["post_tfs"]
+
+        self.N = stats["N"]
+        self.avgdl = stats["avgdl"]
+        self.doc_lengths = sections["doc_lengths"]
+        self.doc_norms = sections["doc_norms"]
+        self.idf = _TermMap(vocabulary, sections["idf"].__getitem__)
+        self.doc_freqs = _TermMap(vocabulary, sections["doc_freqs"].__getitem__)
+        self.max_scores = _TermMap(vocabulary, sections["max_scores"].__getitem__)
+        self.postings = _TermMap(vocabulary, lambda i: (post_docs[post_offsets[i]:post_offsets[i + 1]],
+                                                        post_tfs[post_offsets[i]:post_offsets[i + 1]]))
+        self._sections = sections
+
+    def term_positions(self, term, entry):
+        """Token positions of term in its entry-th posting, read from the bundle"""
+        offsets = self._sections["pos_offsets"]
+        base = self._sections["post_offsets"][self.postings.term_id(term)] + entry
+        return self._sections["positions"][offsets[base]:offsets[base + 1]]
+
+    def _numpy_matrix(self):
+        """The weight matrix as numpy views of the bundle's postings (no per-process copy)"""
+        if self._matrix is not None:
+            return self._matrix
+        if (self.backend or BM25_BACKEND) != "numpy" or self.N == 0:
+            return None
+        np = _import_numpy()
+        if np is None:
+            return None
+        self._matrix = {
+            "np": np,
+            "rows": _TermIds(self.postings),
+            "indptr": np.frombuffer(self._sections["post_offsets"], dtype=np.uint32),
+            "indices": np.frombuffer(self._sections["post_docs"], dtype=np.uint32),
+            "weights": np.frombuffer(self._sections["post_weights"], dtype=np.float64)
+        }
+        return self._matrix
+
+    def __getstate__(self):
+        raise TypeError("BundleBM25 is backed by a memory map and cannot be pickled")
+
+
+class _TermIds:
+    """term -> matrix row (vocabulary position), the lookup BM25._numpy_scores() needs"""
+
+    def __init__(self, term_map):
+        self.get = lambda term, default=None: term_map.term_id(term) if term in term_map else default
+
+
+def open_bundle(path=BUNDLE_PATH):
+    """Open a bundle, or None when it is missing or incompatible"""
+    try:
+        return Bundle(path)
+    except (OSError, ValueError):
+        return None
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile UI Pro Max datasets into a binary bundle")
+    parser.add_argument("--data-dir", type=str, default=str(DATA_DIR), help="Directory of CSV datasets")
+    parser.add_argument("--extra-dir", action="append", default=[],
+                        help="Another data dir to compile (repeatable)")
+    parser.add_argument("--output", "-o", type=str, default=str(BUNDLE_PATH), help="Bundle file to write")
+    args = parser.parse_args()
+
+    info = build_bundle(args.data_dir, args.output, args.extra_dir)
+    print(f"Compiled {info['datasets']} datasets into {info['output']} ({info['bytes']} bytes)")
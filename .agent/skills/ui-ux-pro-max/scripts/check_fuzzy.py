@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fuzzy Recall Check - fails when typo-tolerant search misses a term within reach
+
+Usage: python check_fuzzy.py [--typos 1000] [--seed 0]
+
+Makes typos of indexed words from the federated vocabulary (one or two adjacent
+transpositions, the edit the trigram prefilter is weakest on, or a mix with
+substitutions, insertions and deletions) and checks that the source word is among
+BM25._nearest_terms() whenever it lies within FUZZY_MAX_DISTANCE edits. Also checks
+that "falt design" with fuzzy=True finds Flat Design. Exits 1 when a transposition
+typo misses its word (a mixed typo of a short word may share no trigram with it).
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+
+os.environ.setdefault("UI_UX_QUERY_CACHE", "off")
+
+import core
+
+
+def make_typo(word, rng, transpositions_only):
+    """word with one or two random edits"""
+    chars = list(word)
+    for _ in range(rng.randint(1, 2)):
+        op = 0 if transpositions_only else rng.randrange(4)
+        i = rng.randrange(len(chars) - 1)
+        if op == 0:
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        elif op == 1:
+            chars[i] = rng.choice(string.ascii_lowercase)
+        elif op == 2 and len(chars) > 2:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+    return "".join(chars)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max fuzzy recall check")
+    parser.add_argument("--typos", type=int, default=1000, help="Typos per kind (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    _, _, _, bm25 = core._load_federated_index()
+    vocabulary = [term for term in bm25.postings if len(term) >= 3]
+    rng = random.Random(args.seed)
+    failed = False
+    for kind, transpositions_only in (("transposition", True), ("mixed", False)):
+        checked = misses = 0
+        for _ in range(args.typos):
+            word = rng.choice(vocabulary)
+            typo = make_typo(word, rng, transpositions_only)
+            max_distance = core.FUZZY_MAX_DISTANCE if len(typo) > 4 else 1
+            if typo in bm25.postings or core._edit_distance(typo, word, max_distance) > max_distance:
+                continue
+            checked += 1
+            if word not in {term for term, _ in bm25._nearest_terms(typo, len(vocabulary))}:
+                misses += 1
+                # Mixed edits may leave a short word sharing no trigram at all; only report transpositions
+                if transpositions_only:
+                    print(f"[FAIL] {typo!r} does not reach {word!r}")
+        print(f"{kind}: {checked} typos, {misses} missed")
+        failed = failed or (transpositions_only and misses > 0)
+
+    styles = [row.get("Style Category") for row in core.search("falt design", "style", 3, fuzzy=True)["results"]]
+    if "Flat Design" not in styles:
+        print(f"[FAIL] 'falt design' (fuzzy) returned {styles}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("[OK] Every transposition typo reaches its word")
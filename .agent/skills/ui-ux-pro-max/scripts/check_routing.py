@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Routing Check - fails when keyword domain detection routes a known query elsewhere
+
+Usage: python check_routing.py
+
+Runs detect_domain() on a fixed set of queries with a known domain, and the design
+system's page-type detection on a few page descriptions: plain keywords, plurals and
+other inflections ("charting", "memoized"), word-boundary traps ("build" must not
+count as "ui") and non-word keywords such as "#" in hex colors. Exits 1 when any query
+is routed elsewhere.
+"""
+
+import sys
+
+from core import detect_domain
+from design_system import _detect_page_type
+
+CASES = [
+    ("#1E40AF", "color"),
+    ("#fff text on #000", "color"),
+    ("brand palette hex", "color"),
+    ("line charts for trends", "chart"),
+    ("landing page hero", "landing"),
+    ("fintech saas", "product"),
+    ("glassmorphism cards", "style"),
+    ("build a fast website", "style"),
+    ("wcag keyboard navigation", "ux"),
+    ("serif heading font", "typography"),
+    ("lucide icons", "icons"),
+    ("react memo rerender", "react"),
+    ("aria focus outline", "web"),
+    ("smooth scrolling", "ux"),
+    ("charting library", "chart"),
+    ("memoized selectors", "react"),
+    ("scrollable table", "ux"),
+    ("colorful brand", "color"),
+    ("typography for infographics", "typography"),
+]
+
+PAGE_CASES = [
+    ("authentication screen", "Authentication"),
+    ("configuration panel", "Settings / Profile"),
+    ("ordering flow", "Checkout / Payment"),
+    ("analytics dashboard", "Dashboard / Data View"),
+]
+
+
+if __name__ == "__main__":
+    failures = [(query, expected, detect_domain(query)) for query, expected in CASES
+                if detect_domain(query) != expected]
+    failures += [(query, expected, _detect_page_type(query, [])) for query, expected in PAGE_CASES
+                 if _detect_page_type(query, []) != expected]
+    for query, expected, actual in failures:
+        print(f"[FAIL] {query!r}: expected {expected}, routed to {actual}")
+    if failures:
+        sys.exit(1)
+    print(f"[OK] {len(CASES) + len(PAGE_CASES)} queries routed as expected")
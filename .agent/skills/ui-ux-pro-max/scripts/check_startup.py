@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup Budget Check - fails when cold start of a simple search regresses
+
+Usage: python check_startup.py [--budget-ms 40] [--runs 5] [--query "glassmorphism"]
+
+Runs `python -X importtime search.py "<query>" --no-daemon` several times and sums the
+cumulative time of top-level imports, minus the interpreter's own startup imports
+(`python -X importtime -c pass`). Exits 1 when the median exceeds the budget or when a
+module that a plain domain search should never need shows up in the import list.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SEARCH_SCRIPT = Path(__file__).parent / "search.py"
+DEFAULT_BUDGET_MS = 40
+DEFAULT_RUNS = 5
+
+# Modules a plain in-process domain search must not import (each is lazy by design)
+FORBIDDEN_IMPORTS = ["design_system", "csv", "hashlib", "json", "socket", "socketserver",
+                     "datetime", "numpy", "sqlite3"]
+
+
+def _importtime(args):
+    """Run python -X importtime with args; return {module: cumulative_us} of top-level imports"""
+    env = dict(os.environ)
+    # Measure what users get: bytecode caching on, no daemon
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding='utf-8')
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit():
+            continue  # header line
+        # Nested imports are indented; only top-level ones are summed
+        nested = name.startswith("  ")
+        modules[name.strip()] = (int(cumulative), nested)
+    return modules
+
+
+def _top_level_ms(modules):
+    return sum(us for us, nested in modules.values() if not nested) / 1000
+
+
+def check(query, runs):
+    """Return (median_ms, offending_modules)"""
+    search_args = [str(SEARCH_SCRIPT), query, "--no-daemon"]
+    _importtime(search_args)  # warm bytecode and index caches
+
+    samples = []
+    seen = set()
+    for _ in range(runs):
+        baseline = _top_level_ms(_importtime(["-c", "pass"]))
+        modules = _importtime(search_args)
+        samples.append(_top_level_ms(modules) - baseline)
+        seen.update(modules)
+
+    samples.sort()
+    median = samples[len(samples) // 2]
+    offending = [name for name in FORBIDDEN_IMPORTS if name in seen]
+    return median, offending
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max startup budget check")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help=f"Import time budget above interpreter startup (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help=f"Number of measured runs (default: {DEFAULT_RUNS})")
+    parser.add_argument("--query", type=str, default="glassmorphism", help="Query for the simple search")
+    args = parser.parse_args()
+
+    median, offending = check(args.query, args.runs)
+    print(f"Import time for a simple search: {median:.1f} ms (budget {args.budget_ms:.0f} ms, median of {args.runs})")
+    if offending:
+        print(f"[FAIL] Unexpected imports for a plain search: {', '.join(offending)}")
+    if median > args.budget_ms:
+        print("[FAIL] Startup budget exceeded")
+    if offending or median > args.budget_ms:
+        sys.exit(1)
+    print("[OK] Startup within budget")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Worker Memory Check - compares per-process memory of N search workers with and without the bundle
+
+Usage: python check_worker_memory.py [--workers 4] [--query "dark dashboard"]
+
+Starts N worker processes twice: once serving from the compiled bundle (mmap, see
+bundle.py) and once from the per-dataset pickle artifacts. Every worker loads all
+domain, stack and federated indexes and runs one search on each, then the check
+reads PSS (shared pages divided among the processes mapping them) and private
+memory from /proc/<pid>/smaps_rollup. Exits 1 when the bundle does not lower the
+workers' total PSS. Linux only; skipped elsewhere.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUERY = "dark dashboard"
+
+
+def _worker(bundle_path, query):
+    """Load every index, search each once, report readiness and block until stdin closes"""
+    os.environ["UI_UX_QUERY_CACHE"] = "off"
+    import core
+
+    core.BUNDLE_PATH = Path(bundle_path)
+    for domain in core.CSV_CONFIG:
+        core.search(query, domain)
+    for stack in core.STACK_CONFIG:
+        core.search_stack(query, stack)
+    core.search_all(query)
+    print("ready", flush=True)
+    sys.stdin.read()
+
+
+def _smaps_kb(pid):
+    """{field: kB} from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields
+
+
+def measure(bundle_path, workers, query):
+    """Return (total PSS kB, mean private kB) of `workers` processes serving searches"""
+    procs = [subprocess.Popen([sys.executable, __file__, "--worker", str(bundle_path), "--query", query],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, encoding='utf-8')
+             for _ in range(workers)]
+    try:
+        for proc in procs:
+            if proc.stdout.readline().strip() != "ready":
+                raise RuntimeError(f"Worker {proc.pid} failed to start")
+        stats = [_smaps_kb(proc.pid) for proc in procs]
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+    private = [s.get("Private_Clean", 0) + s.get("Private_Dirty", 0) for s in stats]
+    return sum(s.get("Pss", 0) for s in stats), sum(private) / len(private)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max worker memory check")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Worker processes (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--query", type=str, default=DEFAULT_QUERY, help="Query every worker runs on each dataset")
+    parser.add_argument("--worker", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        _worker(args.worker, args.query)
+        sys.exit(0)
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("[SKIP] /proc/<pid>/smaps_rollup is not available on this platform")
+        sys.exit(0)
+
+    from bundle import build_bundle
+    from core import DATA_DIR
+
+    with tempfile.TemporaryDirectory(prefix="uiux-workers-") as scratch:
+        bundle_path = Path(scratch) / "datasets.bundle"
+        build_bundle(DATA_DIR, bundle_path)
+        # A missing bundle path makes workers use (and first write) the pickle artifacts
+        measure(Path(scratch) / "missing.bundle", 1, args.query)
+        artifacts_pss, artifacts_private = measure(Path(scratch) / "missing.bundle", args.workers, args.query)
+        bundle_pss, bundle_private = measure(bundle_path, args.workers, args.query)
+
+    print(f"{args.workers} workers, all indexes loaded")
+    print(f"  pickle artifacts: total PSS {artifacts_pss / 1024:.1f} MiB, private {artifacts_private / 1024:.1f} MiB/worker")
+    print(f"  mmap bundle:      total PSS {bundle_pss / 1024:.1f} MiB, private {bundle_private / 1024:.1f} MiB/worker")
+    if bundle_pss >= artifacts_pss:
+        print("[FAIL] The bundle does not reduce worker memory")
+        sys.exit(1)
+    print(f"[OK] The bundle saves {(artifacts_pss - bundle_pss) / 1024:.1f} MiB across {args.workers} workers")
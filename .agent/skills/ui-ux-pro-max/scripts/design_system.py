@@ -18,7 +18,7 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, DATA_DIR, KeywordMatcher
 
 
 # ============ CONFIGURATION ============
@@ -35,7 +35,14 @@ SEARCH_CONFIG = {
 
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
-    """Generates design system recommendations from aggregated searches."""
+    """Generates design system recommendations from aggregated searches.
+
+    generate() runs the whole pipeline. Callers that schedule the searches
+    themselves (e.g. async_search.agenerate_design_system) use its stages:
+    product_category() of the product search, reasoning() for that category,
+    domain_queries() to search (the style query depends on the reasoning's
+    style priority), and build() on the search results.
+    """
 
     def __init__(self):
         self.reasoning_data = self._load_reasoning()
@@ -48,18 +55,23 @@ class DesignSystemGenerator:
         with open(filepath, 'r', encoding='utf-8') as f:
             return list(csv.DictReader(f))
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
+    def domain_queries(self, query: str, style_priority: list = None) -> dict:
+        """{domain: (query, max_results)} to search; style_priority (from reasoning()) refines the style query."""
+        queries = {}
         for domain, config in SEARCH_CONFIG.items():
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
                 combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                queries[domain] = (combined_query, config["max_results"])
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                queries[domain] = (query, config["max_results"])
+        return queries
+
+    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
+        """Execute searches across multiple domains."""
+        return {domain: search(domain_query, domain, max_results)
+                for domain, (domain_query, max_results) in self.domain_queries(query, style_priority).items()}
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
@@ -164,19 +176,31 @@ class DesignSystemGenerator:
         """Generate complete design system recommendation."""
         # Step 1: First search product to get category
         product_result = search(query, "product", 1)
-        product_results = product_result.get("results", [])
-        category = "General"
-        if product_results:
-            category = product_results[0].get("Product Type", "General")
+        category = self.product_category(product_result)
 
         # Step 2: Get reasoning rules for this category
-        reasoning = self._apply_reasoning(category, {})
+        reasoning = self.reasoning(category)
         style_priority = reasoning.get("style_priority", [])
 
         # Step 3: Multi-domain search with style priority hints
         search_results = self._multi_domain_search(query, style_priority)
         search_results["product"] = product_result  # Reuse product search
 
+        return self.build(query, project_name, category, reasoning, search_results)
+
+    def product_category(self, product_result: dict) -> str:
+        """Product type of the best match of a product search(), "General" without one."""
+        product_results = product_result.get("results", [])
+        if product_results:
+            return product_results[0].get("Product Type", "General")
+        return "General"
+
+    def reasoning(self, category: str) -> dict:
+        """Reasoning rules (style priority, pattern, moods, ...) for a product category."""
+        return self._apply_reasoning(category, {})
+
+    def build(self, query: str, project_name: str, category: str, reasoning: dict, search_results: dict) -> dict:
+        """Pick the best match per domain of search_results ({domain: search() result}) and assemble the design system."""
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
         color_results = self._extract_results(search_results.get("color", {}))
@@ -460,7 +484,8 @@ def format_markdown(design_system: dict) -> str:
 
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           generator: DesignSystemGenerator = None) -> str:
     """
     Main entry point for design system generation.
 
@@ -471,11 +496,13 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
+        generator: Optional pre-built (warm) DesignSystemGenerator to reuse
 
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
+    if generator is None:
+        generator = DesignSystemGenerator()
     design_system = generator.generate(query, project_name)
     
     # Persist to files if requested
@@ -488,6 +515,14 @@ def generate_design_system(query: str, project_name: str = None, output_format:
 
 
 # ============ PERSISTENCE FUNCTIONS ============
+def _file_slug(name: str, what: str) -> str:
+    """Lowercase, dash-separated file name for name; refuses names that would leave their folder."""
+    slug = name.lower().replace(' ', '-')
+    if not slug or '/' in slug or '\\' in slug or '..' in slug or slug != Path(slug).name:
+        raise ValueError(f"{what} must be a plain name without path separators or '..': {name!r}")
+    return slug
+
+
 def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
@@ -500,12 +535,16 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     
     Returns:
         dict with created file paths and status
+
+    Raises:
+        ValueError: when the project or page name contains a path separator or ".."
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
     # Use project name for project-specific folder
     project_name = design_system.get("project_name", "default")
-    project_slug = project_name.lower().replace(' ', '-')
+    project_slug = _file_slug(project_name, "project name")
+    page_slug = _file_slug(page, "page") if page else None
     
     design_system_dir = base_dir / "design-system" / project_slug
     pages_dir = design_system_dir / "pages"
@@ -526,7 +565,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     
     # If page is specified, create page override file with intelligent content
     if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
+        page_file = pages_dir / f"{page_slug}.md"
         page_content = format_page_override_md(design_system, page, page_query)
         with open(page_file, 'w', encoding='utf-8') as f:
             f.write(page_content)
@@ -1017,27 +1056,26 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
     }
 
 
+_PAGE_TYPE_MATCHER = KeywordMatcher({
+    "Dashboard / Data View": ["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"],
+    "Checkout / Payment": ["checkout", "payment", "cart", "purchase", "order", "billing"],
+    "Settings / Profile": ["settings", "profile", "account", "preferences", "config"],
+    "Landing / Marketing": ["landing", "marketing", "homepage", "hero", "home", "promo"],
+    "Authentication": ["login", "signin", "signup", "register", "auth", "password"],
+    "Pricing / Plans": ["pricing", "plans", "subscription", "tiers", "packages"],
+    "Blog / Article": ["blog", "article", "post", "news", "content", "story"],
+    "Product Detail": ["product", "item", "detail", "pdp", "shop", "store"],
+    "Search Results": ["search", "results", "browse", "filter", "catalog", "list"],
+    "Empty State": ["empty", "404", "error", "not found", "zero"],
+})
+
+
 def _detect_page_type(context: str, style_results: list) -> str:
     """Detect page type from context and search results."""
-    context_lower = context.lower()
-    
-    # Check for common page type patterns
-    page_patterns = [
-        (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
-        (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
-        (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
-        (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
-        (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
-        (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
-        (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
-        (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
-        (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
-        (["empty", "404", "error", "not found", "zero"], "Empty State"),
-    ]
-    
-    for keywords, page_type in page_patterns:
-        if any(kw in context_lower for kw in keywords):
-            return page_type
+    # Check for common page type patterns (most keywords wins, earlier type on ties)
+    page_type = _PAGE_TYPE_MATCHER.best(context)
+    if page_type:
+        return page_type
     
     # Fallback: try to infer from style results
     if style_results:
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Async Load Test - throughput of the asyncio API under many concurrent requests
+
+Usage: python load_test.py [--concurrency 100] [--requests 2000] [--workers 4] [--json]
+
+Keeps --concurrency requests in flight through async_search (asearch, asearch_stack
+and, with --design-system, agenerate_design_system) until --requests have finished,
+then reports throughput, p50/p99 latency and how many requests were coalesced. The
+same request list is also run sequentially with the blocking API as a baseline.
+The query cache is off so every executed request is scored.
+"""
+
+import os
+
+# Score every request instead of serving repeats from the result cache
+os.environ["UI_UX_QUERY_CACHE"] = "off"
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import core
+import async_search
+
+DEFAULT_CONCURRENCY = 100
+DEFAULT_REQUESTS = 2000
+
+QUERIES = ["glassmorphism dark", "minimal clean saas", "fintech crypto dashboard", "luxury serif elegant",
+           "accessibility contrast", "animation reduced motion", "pricing page conversion", "hero section cta",
+           "bar chart trend", "playful colorful kids", "healthcare calm trust", "brutalism bold"]
+
+
+def _requests(count, design_system, seed):
+    """(kind, query, target) tuples: domain searches, stack searches, design systems"""
+    rng = random.Random(seed)
+    domains = [None] + list(core.CSV_CONFIG)
+    requests = []
+    for _ in range(count):
+        roll = rng.random()
+        if design_system and roll < 0.05:
+            requests.append(("design_system", rng.choice(QUERIES), None))
+        elif roll < 0.3:
+            requests.append(("stack", rng.choice(QUERIES), rng.choice(core.AVAILABLE_STACKS)))
+        else:
+            requests.append(("search", rng.choice(QUERIES), rng.choice(domains)))
+    return requests
+
+
+def _call(kind, query, target):
+    if kind == "search":
+        return core.search(query, target)
+    if kind == "stack":
+        return core.search_stack(query, target)
+    from design_system import generate_design_system
+    return generate_design_system(query)
+
+
+async def _acall(kind, query, target):
+    if kind == "search":
+        return await async_search.asearch(query, target)
+    if kind == "stack":
+        return await async_search.asearch_stack(query, target)
+    return await async_search.agenerate_design_system(query)
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_async(requests, concurrency):
+    """Run requests with at most `concurrency` in flight; returns (seconds, latencies ms)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(request):
+        async with semaphore:
+            start = time.perf_counter()
+            await _acall(*request)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(request) for request in requests))
+    return time.perf_counter() - start, latencies
+
+
+def run_sequential(requests):
+    start = time.perf_counter()
+    for request in requests:
+        _call(*request)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max async API load test")
+    parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_CONCURRENCY, help=f"Requests in flight (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--requests", "-n", type=int, default=DEFAULT_REQUESTS, help=f"Total requests (default: {DEFAULT_REQUESTS})")
+    parser.add_argument("--workers", "-w", type=int, default=async_search.ASYNC_WORKERS, help=f"Executor threads (default: {async_search.ASYNC_WORKERS})")
+    parser.add_argument("--design-system", action="store_true", help="Mix in design system generation (~5%% of requests)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the request mix")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    async_search.set_max_workers(args.workers)
+    requests = _requests(args.requests, args.design_system, args.seed)
+    run_sequential(requests[:50])  # warm indexes so both runs measure steady state
+
+    sequential_s = run_sequential(requests)
+    async_s, latencies = asyncio.run(run_async(requests, args.concurrency))
+    stats = async_search.async_stats()
+
+    report = {
+        "requests": len(requests),
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "sequential_rps": round(len(requests) / sequential_s, 1),
+        "async_rps": round(len(requests) / async_s, 1),
+        "speedup": round(sequential_s / async_s, 2),
+        "latency_ms": {"p50": round(_percentile(latencies, 50), 3), "p99": round(_percentile(latencies, 99), 3)},
+        "executed": stats["executed"],
+        "coalesced": stats["coalesced"]
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['requests']} requests, {report['concurrency']} in flight, {report['workers']} workers")
+        print(f"  sequential: {report['sequential_rps']} req/s")
+        print(f"  async:      {report['async_rps']} req/s ({report['speedup']}x), "
+              f"p50 {report['latency_ms']['p50']} ms, p99 {report['latency_ms']['p99']} ms")
+        print(f"  executed {report['executed']}, coalesced {report['coalesced']}")
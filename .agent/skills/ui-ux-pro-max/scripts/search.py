@@ -3,6 +3,12 @@
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --domain ux --filter Severity=High [--filter Platform=Web]
+       python search.py --queries-file queries.txt [--domain <domain>] [--stack <stack>]
+       python search.py "<query>" --all [--max-results 2] [--fuzzy] [--partial]
+       python search.py --serve [--port 8765]
+       python search.py --build-bundle
+       python search.py "<prefix>" --suggest [--domain <domain>] [--limit 10]
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
 
@@ -12,19 +18,52 @@ Stacks: html-tailwind, react, nextjs
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+
+Batch mode:
+  --queries-file  One query per line ("-" for stdin); prints one JSON result per line
+
+Backends:
+  --backend    bm25 (built-in engine, default) or sqlite (FTS5 tables in .index/search.sqlite3);
+               also set by UI_UX_SEARCH_BACKEND
+  --fuzzy      Tolerate typos: unknown terms match their nearest indexed terms (bm25 only)
+  --partial    Match inside words: "morph" also finds "Glassmorphism" (bm25 only)
+  --filter     Keep rows whose column equals a value, case-insensitive (bm25 only); repeat it:
+               columns are AND-ed, values of one column OR-ed. Without a query it lists the rows
+               -d ux --filter Severity=High --filter Platform=Web "touch target" (not with --all)
+
+Service mode:
+  --serve      Keep indexes warm in a local daemon; other invocations use it when
+               running and fall back to in-process search otherwise (--no-daemon)
+
+Query language (bm25):
+  "dark mode" -neumorphism     phrase, excluded term
+  -- "-flat -brutalism"        exclusions only: every row without those terms
+  dashboard AND accessible     both required (plain words are OR-ed)
+  severity:high AND memo       column contains value (name case-insensitive, spaces as _)
+
+Autocomplete:
+  --suggest    Complete a prefix from the indexed terms and row titles (style names, product
+               types, font pairings, landing patterns, stack guidelines, ...), most frequent first
+
+Bundle:
+  --build-bundle  Compile all datasets into .index/datasets.bundle (memory-mapped at load)
+  Worker processes map the same bundle pages, so N workers hold one copy of the indexes.
+  UI_UX_BUNDLE_AUTO_BUILD=1 rebuilds a missing or stale bundle on first use (one process
+  builds under .index/datasets.bundle.lock, the others wait for it).
 """
 
 import argparse
 import sys
-import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+import os
+from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, SEARCH_BACKEND, SEARCH_BACKENDS, SUGGEST_LIMIT
+from server import DEFAULT_PORT, run, serve
 
-# Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
-if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+def force_utf8_output():
+    """Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)"""
+    for stream in (sys.stdout, sys.stderr):
+        if stream.encoding and stream.encoding.lower() != 'utf-8':
+            stream.reconfigure(encoding='utf-8')
 
 
 def format_output(result):
@@ -53,13 +92,41 @@ def format_output(result):
     return "\n".join(output)
 
 
+def format_all_output(result):
+    """Format federated search_all() results grouped per domain"""
+    output = ["## UI Pro Max Search Results (all domains)"]
+    output.append(f"**Query:** {result['query']} | **Found:** {result['count']} results in {len(result['groups'])} domains\n")
+
+    for key, group in result['groups'].items():
+        output.append(f"### {key} ({group['file']}) | **Score:** {group['score']}")
+        for row, score in zip(group['results'], group['scores']):
+            output.append(f"#### Result (score {score})")
+            for name, value in row.items():
+                value_str = str(value)
+                if len(value_str) > 300:
+                    value_str = value_str[:300] + "..."
+                output.append(f"- **{name}:** {value_str}")
+            output.append("")
+
+    return "\n".join(output)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--all", action="store_true", help="Search every domain and stack in one pass, grouped per domain")
+    parser.add_argument("--by-score", action="store_true", help="Without --domain, pick the domain that scores highest instead of keyword detection")
+    parser.add_argument("--backend", choices=SEARCH_BACKENDS, default=SEARCH_BACKEND, help=f"Search engine: built-in BM25 or SQLite FTS5 (default: {SEARCH_BACKEND})")
+    parser.add_argument("--fuzzy", action="store_true", help="Match misspelled terms to the nearest indexed terms (e.g. 'glasmorphism')")
+    parser.add_argument("--partial", action="store_true", help="Also match indexed words containing a query term (e.g. 'morph')")
+    parser.add_argument("--filter", action="append", default=[], metavar="COLUMN=VALUE", help="Only rows whose column has this value (repeatable)")
+    parser.add_argument("--suggest", action="store_true", help="Autocomplete the query as a prefix of indexed terms and row titles")
+    parser.add_argument("--limit", type=int, default=SUGGEST_LIMIT, help=f"Completions for --suggest (default: {SUGGEST_LIMIT})")
+    parser.add_argument("--queries-file", type=str, default=None, help="Batch mode: file with one query per line ('-' for stdin), JSONL output")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
@@ -68,19 +135,81 @@ if __name__ == "__main__":
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Resident service
+    parser.add_argument("--serve", action="store_true", help="Run the search daemon (keeps indexes warm)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Daemon port on 127.0.0.1 (default: {DEFAULT_PORT})")
+    parser.add_argument("--no-daemon", action="store_true", help="Always search in-process, never contact the daemon")
+    parser.add_argument("--build-bundle", action="store_true", help="Compile all datasets into a memory-mapped bundle and exit")
 
     args = parser.parse_args()
+    force_utf8_output()
+    if args.serve:
+        serve(port=args.port)
+        sys.exit(0)
+    if args.build_bundle:
+        from bundle import build_bundle
+        info = build_bundle()
+        print(f"Compiled {info['datasets']} datasets into {info['output']} ({info['bytes']} bytes)")
+        sys.exit(0)
+    filters = {}
+    for item in args.filter:
+        column, sep, value = item.partition("=")
+        if not sep or not column.strip():
+            parser.error(f"--filter expects COLUMN=VALUE, got {item!r}")
+        filters.setdefault(column.strip(), []).append(value)
+    if args.all and filters:
+        parser.error("--filter does not combine with --all: columns differ per domain, pick one with --domain")
+    if args.query is None and filters:
+        args.query = ""
+    if args.query is None and not args.queries_file:
+        parser.error("a query or --queries-file is required")
+    use_daemon = not args.no_daemon
 
+    # Batch mode: one JSON result per input line
+    if args.queries_file:
+        import json
+        if args.queries_file == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(args.queries_file, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        queries = [line.strip() for line in lines if line.strip()]
+        if args.stack:
+            request = {"action": "search_stack_many", "queries": queries, "stack": args.stack}
+        else:
+            request = {"action": "search_many", "queries": queries, "domain": args.domain, "by_score": args.by_score}
+        request["max_results"] = args.max_results
+        request["backend"] = args.backend
+        request.update(fuzzy=args.fuzzy, partial=args.partial, filters=filters)
+        results = run(request, use_daemon, port=args.port)
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False))
+    # Autocomplete
+    elif args.suggest:
+        result = run({"action": "suggest", "prefix": args.query, "domain": args.domain, "limit": args.limit},
+                     use_daemon, port=args.port)
+        if args.json:
+            import json
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            for completion in result:
+                if "error" in completion:
+                    print(f"Error: {completion['error']}")
+                    continue
+                where = f" [{completion['domain']}]" if completion["domain"] else ""
+                print(f"{completion['text']}\t{completion['kind']}{where}\t{completion['count']}")
     # Design system takes priority
-    if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
-            persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
-        )
+    elif args.design_system:
+        result = run({
+            "action": "design_system",
+            "query": args.query,
+            "project_name": args.project_name,
+            "format": args.format,
+            "persist": args.persist,
+            "page": args.page,
+            # Resolve here: the daemon's working directory is not ours
+            "output_dir": os.path.abspath(args.output_dir or os.getcwd())
+        }, use_daemon, port=args.port)
         print(result)
         
         # Print persistence confirmation
@@ -96,9 +225,20 @@ if __name__ == "__main__":
             print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
             print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
             print("=" * 60)
+    # Federated search across all domains and stacks
+    elif args.all:
+        result = run({"action": "search_all", "query": args.query, "max_results": args.max_results, "fuzzy": args.fuzzy,
+                      "partial": args.partial}, use_daemon, port=args.port)
+        if args.json:
+            import json
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_all_output(result))
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        result = run({"action": "search_stack", "query": args.query, "stack": args.stack, "max_results": args.max_results,
+                      "backend": args.backend, "fuzzy": args.fuzzy, "partial": args.partial, "filters": filters},
+                     use_daemon, port=args.port)
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -106,7 +246,9 @@ if __name__ == "__main__":
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        result = run({"action": "search", "query": args.query, "domain": args.domain, "max_results": args.max_results,
+                      "by_score": args.by_score, "backend": args.backend, "fuzzy": args.fuzzy, "partial": args.partial,
+                      "filters": filters}, use_daemon, port=args.port)
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Sharded Scoring - one BM25 index split across worker processes
+
+Usage:
+    from shards import ShardedBM25
+    with ShardedBM25(shards=4) as index:
+        index.fit(documents)
+        index.top_k("glassmorphism dark", 10)        # same API and results as core.BM25
+        index.score_batch(queries, 10)
+
+    python shards.py --scale 100 --shards 4          # verify against core.BM25 and time both
+
+Documents are split into contiguous doc id ranges, one per persistent worker
+process. Fitting takes two rounds: workers tokenize their range and report document
+frequencies and lengths, then every worker adopts the merged collection statistics
+(N, avgdl, document frequencies), so each document scores exactly as in a single
+index. Each query is answered by every worker's own top-k; the global top-k is a
+merge of those lists by (score desc, doc id asc), the engine's own tie-break.
+"""
+
+import heapq
+import multiprocessing
+import os
+from collections import defaultdict
+
+from core import BM25
+
+
+# ============ WORKER PROCESS ============
+def _serve_shard(conn, k1, b):
+    """Worker loop: holds one shard and answers commands over a pipe"""
+    bm25 = BM25(k1=k1, b=b)
+    offset = 0
+    while True:
+        command, payload = conn.recv()
+        try:
+            if command == "fit":
+                offset, documents = payload
+                bm25.fit(documents)
+                reply = (len(documents), sum(bm25.doc_lengths), dict(bm25.doc_freqs))
+            elif command == "collection":
+                n, total_length, doc_freqs = payload
+                bm25.set_collection(n, total_length, doc_freqs)
+                reply = None
+            elif command == "top_k":
+                queries, k = payload
+                reply = [[(doc + offset, score) for doc, score in ranked]
+                         for ranked in bm25.score_batch(queries, k)]
+            elif command == "close":
+                break
+            else:
+                raise ValueError(f"Unknown shard command: {command}")
+        except Exception as e:  # report to the coordinator instead of dying silently
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+        else:
+            conn.send(("ok", reply))
+    conn.close()
+
+
+# ============ COORDINATOR ============
+class ShardedBM25:
+    """BM25 over doc id range shards, each scored in its own worker process
+
+    shards: number of worker processes (default: CPU count). top_k() and
+    score_batch() return exactly what core.BM25 returns for the same documents.
+    """
+
+    def __init__(self, shards=None, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.num_shards = max(1, shards or os.cpu_count() or 1)
+        self.N = 0
+        self.avgdl = 0
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self):
+        context = multiprocessing.get_context()
+        for _ in range(self.num_shards):
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve_shard, args=(child, self.k1, self.b), daemon=True)
+            process.start()
+            child.close()
+            self._workers.append((process, parent))
+
+    def _broadcast(self, payloads):
+        """Send one (command, payload) per worker, then collect every reply in order"""
+        for (_, conn), message in zip(self._workers, payloads):
+            conn.send(message)
+        replies = []
+        for _, conn in self._workers:
+            status, reply = conn.recv()
+            if status != "ok":
+                raise RuntimeError(f"Shard worker failed: {reply}")
+            replies.append(reply)
+        return replies
+
+    def fit(self, documents):
+        """Split documents into contiguous shards and fit them with global statistics"""
+        documents = list(documents)
+        if not self._workers:
+            self._start()
+        size = -(-len(documents) // self.num_shards) if documents else 0
+        stats = self._broadcast([("fit", (i * size, documents[i * size:(i + 1) * size]))
+                                 for i in range(self.num_shards)])
+
+        # Document frequencies merged in shard (= doc id) order, like a single fit()
+        doc_freqs = defaultdict(int)
+        total_length = 0
+        for count, length, shard_freqs in stats:
+            total_length += length
+            for word, freq in shard_freqs.items():
+                doc_freqs[word] += freq
+        self.N = sum(count for count, _, _ in stats)
+        self.avgdl = total_length / self.N if self.N else 0
+        self._broadcast([("collection", (self.N, total_length, dict(doc_freqs)))] * self.num_shards)
+
+    def score_batch(self, queries, k):
+        """top_k() for many queries, one round trip to every worker"""
+        queries = list(queries)
+        if k <= 0 or not queries or not self._workers:
+            return [[] for _ in queries]
+        per_shard = self._broadcast([("top_k", (queries, k))] * self.num_shards)
+        results = []
+        for i in range(len(queries)):
+            merged = heapq.merge(*(shard[i] for shard in per_shard), key=lambda hit: (-hit[1], hit[0]))
+            results.append([hit for _, hit in zip(range(k), merged)])
+        return results
+
+    def top_k(self, query, k):
+        """Top k (doc id, score) pairs with score > 0 across all shards"""
+        return self.score_batch([query], k)[0]
+
+    def close(self):
+        """Stop the worker processes"""
+        for process, conn in self._workers:
+            try:
+                conn.send(("close", None))
+            except OSError:
+                pass
+            conn.close()
+        for process, _ in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._workers = []
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    import time
+
+    import benchmark
+    import core
+
+    parser = argparse.ArgumentParser(description="Verify and time sharded BM25 scoring")
+    parser.add_argument("--shards", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--scale", type=int, default=10, help="Synthetic corpus scale factor (default: 10)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to compare (default: 200)")
+    parser.add_argument("-k", type=int, default=10, help="Top-k (default: 10)")
+    args = parser.parse_args()
+
+    # Merged corpus: the federated documents of a scaled copy of every dataset
+    with tempfile.TemporaryDirectory(prefix="uiux-shards-") as scratch:
+        if args.scale > 1:
+            core.DATA_DIR = benchmark.write_corpus(f"{scratch}/data", args.scale)
+        documents = []
+        for source in core._federated_sources():
+            store = core.ColumnStore.from_csv(core.DATA_DIR / source["file"], source["search_cols"])
+            documents.extend(store.text(idx, source["search_cols"]) for idx in range(len(store)))
+
+    start = time.perf_counter()
+    single = BM25()
+    single.fit(documents)
+    single_fit = time.perf_counter() - start
+
+    queries = []
+    for i in range(args.queries):
+        tokens = core._tokenize(documents[(i * 7919) % len(documents)])
+        queries.append(" ".join(tokens[i % 3:i % 3 + 1 + i % 3]))
+
+    start = time.perf_counter()
+    expected = single.score_batch(queries, args.k)
+    single_query = time.perf_counter() - start
+
+    with ShardedBM25(args.shards) as sharded:
+        start = time.perf_counter()
+        sharded.fit(documents)
+        sharded_fit = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = sharded.score_batch(queries, args.k)
+        sharded_query = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(expected, actual))
+    print(f"{len(documents)} documents, {sharded.num_shards} shards, {len(queries)} queries, top-{args.k}")
+    print(f"  fit:     single {single_fit * 1000:.0f} ms, sharded {sharded_fit * 1000:.0f} ms")
+    print(f"  queries: single {single_query * 1000:.0f} ms, sharded {sharded_query * 1000:.0f} ms")
+    print(f"  rankings identical: {mismatches == 0} ({mismatches} mismatches)")
+    raise SystemExit(1 if mismatches else 0)
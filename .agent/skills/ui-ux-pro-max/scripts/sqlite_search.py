@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max SQLite Backend - FTS5 tables as an alternative to the built-in BM25 engine
+
+Usage: UI_UX_SEARCH_BACKEND=sqlite python search.py "<query>" ...
+       python search.py "<query>" --backend sqlite
+
+Each dataset becomes one FTS5 table in .index/search.sqlite3: the BM25 document
+(tokenized exactly like core._tokenize) is the only indexed column, output columns
+are stored UNINDEXED and rows keep their CSV position as rowid. Tables are rebuilt
+when their CSV changes; the database runs in WAL mode so any number of processes
+can read while one rebuilds.
+
+Rankings use SQLite's bm25() (k1=1.2, b=0.75, a slightly different IDF), so they
+agree with the built-in engine on most but not all top-k positions; see
+check_sqlite_parity.py.
+"""
+
+import sqlite3
+import threading
+
+from core import ColumnStore, SQLITE_PATH, _file_fingerprint, _file_hash, _tokenize
+
+# One connection per thread (sqlite3 connections are not shareable across threads)
+_LOCAL = threading.local()
+_FTS5 = {}
+
+
+def _connect(path=SQLITE_PATH):
+    """Return (connection, verified tables memo) for this thread"""
+    connections = getattr(_LOCAL, "connections", None)
+    if connections is None:
+        connections = _LOCAL.connections = {}
+    entry = connections.get(path)
+    if entry is None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+        except (OSError, sqlite3.Error):
+            # Read-only install: keep the tables for this process only
+            conn = sqlite3.connect(":memory:", isolation_level=None)
+        conn.execute("""CREATE TABLE IF NOT EXISTS datasets (
+            name TEXT PRIMARY KEY, tbl TEXT, size INTEGER, mtime_ns INTEGER, sha256 TEXT,
+            search_cols TEXT, output_cols TEXT, stored_cols TEXT)""")
+        entry = connections[path] = (conn, {})
+    return entry
+
+
+def fts5_available():
+    """True when the linked SQLite library has the FTS5 extension"""
+    if "ok" not in _FTS5:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(body)")
+            _FTS5["ok"] = True
+        except sqlite3.OperationalError:
+            _FTS5["ok"] = False
+        finally:
+            conn.close()
+    return _FTS5["ok"]
+
+
+def _join(cols):
+    return "\x1f".join(cols)
+
+
+def _split(text):
+    return text.split("\x1f") if text else []
+
+
+def _table_name(name):
+    return "fts_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _build_table(conn, filepath, name, search_cols, output_cols, size, mtime_ns, sha256):
+    """(Re)create the FTS5 table for one dataset inside the caller's transaction"""
+    store = ColumnStore.from_csv(filepath, list(search_cols) + list(output_cols))
+    stored_cols = [col for col in dict.fromkeys(output_cols) if col in store.columns]
+    table = _table_name(name)
+
+    conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    columns = ["body"] + [f"c{i} UNINDEXED" for i in range(len(stored_cols))]
+    conn.execute(f'CREATE VIRTUAL TABLE "{table}" USING fts5({", ".join(columns)}, '
+                 f"tokenize=\"unicode61 remove_diacritics 0 tokenchars '_'\")")
+    names = ["rowid", "body"] + [f"c{i}" for i in range(len(stored_cols))]
+    conn.executemany(
+        f'INSERT INTO "{table}" ({", ".join(names)}) VALUES ({", ".join("?" * len(names))})',
+        ((idx, " ".join(_tokenize(store.text(idx, search_cols))), *(store.columns[col][idx] for col in stored_cols))
+         for idx in range(len(store)))
+    )
+    conn.execute("INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                 (name, table, size, mtime_ns, sha256, _join(search_cols), _join(output_cols), _join(stored_cols)))
+    return table, stored_cols
+
+
+def _ensure_table(conn, verified, filepath, name, search_cols, output_cols):
+    """Return (table, stored output columns) for an up-to-date FTS5 table of the CSV"""
+    size, mtime_ns = _file_fingerprint(filepath)
+    key = (name, size, mtime_ns, tuple(search_cols), tuple(output_cols))
+    memo = verified.get(name)
+    if memo is not None and memo[0] == key:
+        return memo[1]
+
+    def lookup():
+        row = conn.execute("SELECT tbl, size, mtime_ns, sha256, search_cols, output_cols, stored_cols "
+                           "FROM datasets WHERE name = ?", (name,)).fetchone()
+        if row is None or row[4] != _join(search_cols) or row[5] != _join(output_cols):
+            return None, None
+        return row, (row[0], _split(row[6]))
+
+    row, table = lookup()
+    if row is None or row[1] != size or row[2] != mtime_ns:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row, table = lookup()  # another process may have rebuilt it meanwhile
+            if row is None or row[1] != size or row[2] != mtime_ns:
+                sha256 = _file_hash(filepath)
+                if row is not None and row[1] == size and row[3] == sha256:
+                    # Touched but unchanged: just record the new mtime
+                    conn.execute("UPDATE datasets SET mtime_ns = ? WHERE name = ?", (mtime_ns, name))
+                else:
+                    table = _build_table(conn, filepath, name, search_cols, output_cols, size, mtime_ns, sha256)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    verified[name] = (key, table)
+    return table
+
+
+def search_file(filepath, name, search_cols, output_cols, queries, max_results):
+    """Top max_results rows (dicts of output_cols) for each query, best first"""
+    conn, verified = _connect()
+    table, stored_cols = _ensure_table(conn, verified, filepath, name, search_cols, output_cols)
+    selected = "".join(f", c{i}" for i in range(len(stored_cols)))
+    sql = (f'SELECT rowid, bm25("{table}") AS score{selected} FROM "{table}" '
+           f'WHERE "{table}" MATCH ? ORDER BY score, rowid LIMIT ?')
+
+    output = []
+    for query in queries:
+        tokens = _tokenize(query)
+        if not tokens or max_results <= 0:
+            output.append([])
+            continue
+        # Tokens are \w-only, so quoting them as FTS5 strings is always safe
+        match = " OR ".join(f'"{token}"' for token in tokens)
+        output.append([dict(zip(stored_cols, row[2:])) for row in conn.execute(sql, (match, max_results))])
+    return output
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Benchmark - index build, query latency, batch throughput and memory per dataset
+
+Usage: python benchmark.py [--scale 1 10 100] [--queries 200] [--output bench.json]
+       python benchmark.py --compare before.json after.json
+       python benchmark.py --write-corpus /tmp/corpus-100x --scale 100
+
+Every CSV_CONFIG domain and STACK_CONFIG stack is measured. --scale N runs against a
+synthetic copy of the data directory where every dataset has N times as many rows,
+made by recombining column values of real rows (seeded, so runs are comparable).
+Indexes are written to a scratch directory and the query cache is off, so numbers
+reflect the engine, not earlier runs. Results are one JSON document on stdout (or
+--output); --compare prints the relative change between two such documents.
+"""
+
+import os
+import sys
+
+# Measure the engine, not the result cache
+os.environ["UI_UX_QUERY_CACHE"] = "off"
+
+import argparse
+import csv
+import json
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import core
+from core import CSV_CONFIG, STACK_CONFIG, _STACK_COLS, _tokenize
+
+DEFAULT_QUERIES = 200
+DEFAULT_BATCH = 1000
+DEFAULT_SEED = 42
+
+
+# ============ SYNTHETIC CORPUS ============
+def _read_csv(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        rows = [row for row in csv.reader(f) if row]
+    return (rows[0], rows[1:]) if rows else ([], [])
+
+
+def scale_csv(src, dst, factor, seed=DEFAULT_SEED):
+    """Write a copy of src with factor times as many rows
+
+    The original rows come first; the rest take each column's value from a random
+    real row, so vocabulary and value lengths follow the real distribution.
+    """
+    header, rows = _read_csv(src)
+    rng = random.Random(f"{seed}:{Path(src).name}")
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with open(dst, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+        if rows:
+            for _ in range(len(rows) * (factor - 1)):
+                row = []
+                for col in range(len(header)):
+                    donor = rng.choice(rows)
+                    row.append(donor[col] if col < len(donor) else "")
+                writer.writerow(row)
+
+
+def write_corpus(output_dir, factor, seed=DEFAULT_SEED):
+    """Scale every CSV under DATA_DIR into output_dir (same layout)"""
+    output_dir = Path(output_dir)
+    for src in sorted(core.DATA_DIR.rglob("*.csv")):
+        scale_csv(src, output_dir / src.relative_to(core.DATA_DIR), factor, seed)
+    return output_dir
+
+
+# ============ MEASUREMENTS ============
+def _datasets():
+    """(name, config file, search cols, output cols, domain, stack) for every dataset"""
+    for domain, config in CSV_CONFIG.items():
+        yield domain, config["file"], config["search_cols"], config["output_cols"], domain, None
+    for stack, config in STACK_CONFIG.items():
+        yield (f"stack:{stack}", config["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"],
+               None, stack)
+
+
+def _queries(store, search_cols, count, seed):
+    """Queries of 1-3 words drawn from the dataset's own search text"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count if len(store) else 0):
+        tokens = _tokenize(store.text(rng.randrange(len(store)), search_cols))
+        if tokens:
+            queries.append(" ".join(rng.sample(tokens, min(len(tokens), rng.randint(1, 3)))))
+    return queries
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _build_memory(filepath, search_cols, output_cols):
+    """(retained, peak) bytes allocated while building one index"""
+    tracemalloc.start()
+    index = core._build_index(filepath, search_cols, output_cols)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del index
+    return retained, peak
+
+
+def bench_dataset(name, file, search_cols, output_cols, domain, stack, num_queries, batch_size, seed):
+    filepath = core.DATA_DIR / file
+    if not filepath.exists():
+        return None
+
+    start = time.perf_counter()
+    store, bm25 = core._build_index(filepath, search_cols, output_cols)
+    build_ms = (time.perf_counter() - start) * 1000
+    retained, peak = _build_memory(filepath, search_cols, output_cols)
+
+    # Warm the in-process index (also writes the artifact to the scratch index dir)
+    start = time.perf_counter()
+    core._load_index(filepath, search_cols, output_cols)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    queries = _queries(store, search_cols, num_queries, seed)
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        if stack:
+            core.search_stack(query, stack)
+        else:
+            core.search(query, domain)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    batch = (queries * (batch_size // max(len(queries), 1) + 1))[:batch_size]
+    start = time.perf_counter()
+    if stack:
+        core.search_stack_many(batch, stack)
+    else:
+        core.search_many(batch, domain)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "rows": len(store),
+        "terms": len(bm25.postings),
+        "postings": sum(len(doc_ids) for doc_ids, _ in bm25.postings.values()),
+        "build_ms": round(build_ms, 3),
+        "first_load_ms": round(load_ms, 3),
+        "index_bytes": retained,
+        "build_peak_bytes": peak,
+        "queries": len(latencies),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 4),
+            "p99": round(_percentile(latencies, 99), 4),
+            "mean": round(sum(latencies) / len(latencies), 4),
+            "max": round(max(latencies), 4)
+        } if latencies else None,
+        "batch_queries": len(batch),
+        "batch_qps": round(len(batch) / batch_s, 1) if batch and batch_s > 0 else None
+    }
+
+
+def _max_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _git_commit():
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+                              capture_output=True, encoding='utf-8', timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def run(scales, num_queries=DEFAULT_QUERIES, batch_size=DEFAULT_BATCH, seed=DEFAULT_SEED, only=None):
+    """Benchmark every dataset at each scale; returns the JSON-serializable report"""
+    real_paths = core.DATA_DIR, core.INDEX_DIR, core.BUNDLE_PATH
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bm25_backend": core.BM25_BACKEND,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "queries": num_queries,
+            "batch": batch_size,
+            "seed": seed
+        },
+        "scales": {}
+    }
+
+    for factor in scales:
+        scratch = Path(tempfile.mkdtemp(prefix=f"uiux-bench-{factor}x-"))
+        try:
+            core.DATA_DIR = write_corpus(scratch / "data", factor, seed) if factor > 1 else real_paths[0]
+            core.INDEX_DIR = scratch / ".index"
+            core.BUNDLE_PATH = core.INDEX_DIR / "datasets.bundle"  # never built here
+            core._INDEX_REGISTRY.clear()
+
+            results = {}
+            for name, *dataset in _datasets():
+                if only and name not in only:
+                    continue
+                print(f"[{factor}x] {name}", file=sys.stderr, flush=True)
+                results[name] = bench_dataset(name, *dataset, num_queries, batch_size, seed)
+            report["scales"][f"{factor}x"] = results
+        finally:
+            core.DATA_DIR, core.INDEX_DIR, core.BUNDLE_PATH = real_paths
+            core._INDEX_REGISTRY.clear()
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    report["meta"]["max_rss_bytes"] = _max_rss_bytes()
+    return report
+
+
+# ============ COMPARISON ============
+_COMPARED = [("build_ms", ("build_ms",), False), ("p50", ("latency_ms", "p50"), False),
+             ("p99", ("latency_ms", "p99"), False), ("qps", ("batch_qps",), True),
+             ("index_bytes", ("index_bytes",), False)]
+
+
+def _metric(result, path):
+    for key in path:
+        if not isinstance(result, dict):
+            return None
+        result = result.get(key)
+    return result
+
+
+def compare(before, after):
+    """Text table of after/before ratios for the metrics both reports share"""
+    lines = [f"{'Scale':<6} {'Dataset':<22} " + " ".join(f"{label:>12}" for label, _, _ in _COMPARED)]
+    for scale, datasets in after["scales"].items():
+        for name, result in datasets.items():
+            old = before.get("scales", {}).get(scale, {}).get(name)
+            if not old or not result:
+                continue
+            cells = []
+            for label, path, higher_is_better in _COMPARED:
+                a, b = _metric(old, path), _metric(result, path)
+                if not a or b is None:
+                    cells.append(f"{'-':>12}")
+                    continue
+                change = (b - a) / a * 100
+                worse = change < 0 if higher_is_better else change > 0
+                cells.append(f"{change:>+10.1f}%{'!' if worse and abs(change) >= 10 else ' '}")
+            lines.append(f"{scale:<6} {name:<22} " + " ".join(cells))
+    lines.append("(! = at least 10% worse)")
+    return "\n".join(lines)
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max search benchmark")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1], help="Corpus scale factors, e.g. 1 10 100 1000 (default: 1)")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES, help=f"Single queries per dataset (default: {DEFAULT_QUERIES})")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help=f"Queries per batch throughput run (default: {DEFAULT_BATCH})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed for synthetic rows and queries")
+    parser.add_argument("--only", nargs="+", default=None, help="Restrict to datasets, e.g. style ux stack:react")
+    parser.add_argument("--output", "-o", type=str, default=None, help="Write the JSON report to a file instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two JSON reports and exit")
+    parser.add_argument("--write-corpus", type=str, default=None, help="Only write the scaled corpus (first --scale) to this directory")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], 'r', encoding='utf-8') as f:
+            before = json.load(f)
+        with open(args.compare[1], 'r', encoding='utf-8') as f:
+            after = json.load(f)
+        print(compare(before, after))
+        sys.exit(0)
+
+    if args.write_corpus:
+        print(write_corpus(args.write_corpus, args.scale[0], args.seed))
+        sys.exit(0)
+
+    report = run(args.scale, args.queries, args.batch, args.seed, args.only)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
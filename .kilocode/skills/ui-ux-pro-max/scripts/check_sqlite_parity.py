@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite Parity Check - compares the SQLite FTS5 backend against the built-in BM25 rankings
+
+Usage: python check_sqlite_parity.py [--max-results 3] [--min-overlap 0.8] [--verbose]
+
+Every domain and stack is queried with the first search column of each of its rows
+(style names, product types, guideline titles, ...). For each query the top-k rows
+of both backends are compared: overlap is |bm25 ∩ sqlite| / |bm25|. FTS5's bm25()
+uses other constants than core.BM25, so exact agreement is not expected. Exits 1
+when the mean overlap drops below --min-overlap or a backend returns no rows where
+the other does.
+"""
+
+import argparse
+import sys
+
+from core import CSV_CONFIG, DATA_DIR, MAX_RESULTS, STACK_CONFIG, _STACK_COLS, _rank_queries, _resolve_backend
+
+DEFAULT_MIN_OVERLAP = 0.8
+
+
+def _datasets():
+    for domain, config in CSV_CONFIG.items():
+        yield domain, DATA_DIR / config["file"], config["search_cols"], config["output_cols"]
+    for stack, config in STACK_CONFIG.items():
+        yield f"stack:{stack}", DATA_DIR / config["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"]
+
+
+def _queries(filepath, search_cols):
+    """Distinct non-empty values of the first search column"""
+    from core import ColumnStore
+    store = ColumnStore.from_csv(filepath, search_cols[:1])
+    values = store.columns.get(search_cols[0], [])
+    return list(dict.fromkeys(value.strip() for value in values if value and value.strip()))
+
+
+def _key(row):
+    return tuple(sorted(row.items()))
+
+
+def check(max_results, verbose=False):
+    """Return {dataset: (queries, mean_overlap, top1_agreement, empty_mismatches)}"""
+    report = {}
+    for name, filepath, search_cols, output_cols in _datasets():
+        if not filepath.exists():
+            continue
+        queries = _queries(filepath, search_cols)
+        if not queries:
+            continue
+        expected = _rank_queries(filepath, search_cols, output_cols, queries, max_results, "bm25")
+        actual = _rank_queries(filepath, search_cols, output_cols, queries, max_results, "sqlite")
+
+        overlaps = []
+        top1 = 0
+        empty = 0
+        for query, bm25_rows, sqlite_rows in zip(queries, expected, actual):
+            bm25_keys = [_key(row) for row in bm25_rows]
+            sqlite_keys = [_key(row) for row in sqlite_rows]
+            if bool(bm25_keys) != bool(sqlite_keys):
+                empty += 1
+            if not bm25_keys:
+                continue
+            overlaps.append(len(set(bm25_keys) & set(sqlite_keys)) / len(bm25_keys))
+            top1 += bool(sqlite_keys) and bm25_keys[0] == sqlite_keys[0]
+            if verbose and overlaps[-1] < 1:
+                print(f"  {name}: {query!r} overlap {overlaps[-1]:.2f}")
+
+        mean = sum(overlaps) / len(overlaps) if overlaps else 1.0
+        report[name] = (len(queries), mean, top1 / len(overlaps) if overlaps else 1.0, empty)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max SQLite backend parity check")
+    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help=f"Top-k to compare (default: {MAX_RESULTS})")
+    parser.add_argument("--min-overlap", type=float, default=DEFAULT_MIN_OVERLAP, help=f"Required mean top-k overlap (default: {DEFAULT_MIN_OVERLAP})")
+    parser.add_argument("--verbose", "-v", action="store_true", help="List queries whose top-k differ")
+    args = parser.parse_args()
+
+    if _resolve_backend("sqlite") != "sqlite":
+        print("[SKIP] SQLite library has no FTS5 support")
+        sys.exit(0)
+
+    report = check(args.max_results, args.verbose)
+    total = sum(queries for queries, _, _, _ in report.values())
+    mean = sum(queries * overlap for queries, overlap, _, _ in report.values()) / total
+    empty = sum(mismatches for _, _, _, mismatches in report.values())
+
+    print(f"{'Dataset':<22} {'Queries':>7} {'Overlap':>8} {'Top-1':>7}")
+    for name, (queries, overlap, top1, _) in report.items():
+        print(f"{name:<22} {queries:>7} {overlap:>8.3f} {top1:>7.3f}")
+    print(f"Mean top-{args.max_results} overlap: {mean:.3f} over {total} queries (minimum {args.min_overlap})")
+
+    if empty:
+        print(f"[FAIL] {empty} queries matched rows on only one backend")
+    if mean < args.min_overlap:
+        print("[FAIL] SQLite rankings diverge from BM25")
+    if empty or mean < args.min_overlap:
+        sys.exit(1)
+    print("[OK] SQLite backend agrees with BM25")
@@ -2,17 +2,59 @@
 # -*- coding: utf-8 -*-
 """
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
+
+csv, pickle, hashlib, difflib, json and sqlite3 are imported where used: a warm
+search only needs the index artifact, and the CLI is usually run as a fresh
+subprocess per query.
 """
 
-import csv
+import heapq
+import os
 import re
+import sys
+import threading
+import time
+import weakref
+from bisect import bisect_left
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
+INDEX_DIR = Path(__file__).parent.parent / ".index"
+BUNDLE_PATH = INDEX_DIR / "datasets.bundle"  # optional, built by `search.py --build-bundle`
+# Rebuild the bundle on first use when it is missing or stale (one process builds, the rest wait)
+BUNDLE_AUTO_BUILD = os.environ.get("UI_UX_BUNDLE_AUTO_BUILD", "") == "1"
+BUNDLE_LOCK_TIMEOUT = 60  # seconds to wait for another process's build
+# Bump on any change to the index artifacts or to ranking: it also keys the query cache
+INDEX_VERSION = 10
 MAX_RESULTS = 3
+# "python" (default) or "numpy"; numpy falls back to python when not installed
+BM25_BACKEND = os.environ.get("UI_UX_BM25_BACKEND", "python")
+# fuzzy=True searches: an unknown query term is replaced by vocabulary terms within
+# FUZZY_MAX_DISTANCE edits, each weighted FUZZY_WEIGHT ** distance
+FUZZY_MAX_DISTANCE = 2
+FUZZY_EXPANSIONS = 3  # nearest vocabulary terms per unknown term
+FUZZY_WEIGHT = 0.5
+# partial=True searches: a query term also matches up to PARTIAL_EXPANSIONS indexed
+# terms containing it ("morph" -> "glassmorphism"), weighted by the share it covers
+PARTIAL_EXPANSIONS = 10
+# "bm25" (default, built-in engine) or "sqlite" (FTS5 tables, see sqlite_search.py);
+# sqlite falls back to bm25 when the SQLite library lacks FTS5
+SEARCH_BACKEND = os.environ.get("UI_UX_SEARCH_BACKEND", "bm25")
+SEARCH_BACKENDS = ["bm25", "sqlite"]
+SQLITE_PATH = INDEX_DIR / "search.sqlite3"
+# Query result cache: "disk" (default, shared across invocations, written at exit),
+# "memory" or "off"; long-lived hosts (daemon, async API) default to "memory"
+QUERY_CACHE_MODE = os.environ.get("UI_UX_QUERY_CACHE", "disk")
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_TTL = None  # seconds; None keeps entries until evicted or invalidated
+# Per-query stage timings as JSONL in this directory (unset: telemetry off)
+TELEMETRY_DIR = os.environ.get("UI_UX_TELEMETRY_DIR")
+SLOW_QUERY_MS = float(os.environ.get("UI_UX_SLOW_QUERY_MS", "50"))
+TELEMETRY_MAX_BYTES = 5 * 1024 * 1024  # per log file before rotation
+TELEMETRY_BACKUPS = 3
 
 CSV_CONFIG = {
     "style": {
@@ -91,128 +133,1814 @@ _STACK_COLS = {
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
+# Row title per domain ("stack" for every stack), completed by suggest()
+TITLE_COLS = {
+    "style": "Style Category",
+    "color": "Product Type",
+    "chart": "Data Type",
+    "landing": "Pattern Name",
+    "product": "Product Type",
+    "ux": "Issue",
+    "typography": "Font Pairing Name",
+    "icons": "Icon Name",
+    "react": "Issue",
+    "web": "Issue",
+    "stack": "Guideline"
+}
+SUGGEST_LIMIT = 10
+
 
 # ============ BM25 IMPLEMENTATION ============
+def _tokenize(text):
+    """Lowercase, split, remove punctuation, filter short words"""
+    text = re.sub(r'[^\w\s]', ' ', str(text).lower())
+    return [w for w in text.split() if len(w) > 2]
+
+
+def _trigrams(word):
+    """Distinct character trigrams of a word padded with "$" ("$gl", "gla", ..., "ss$")"""
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent transpositions count as one edit), capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        # Later rows build on this one (+1) or, via transpositions, on the one before (+1)
+        if min(current) > limit and min(previous) >= limit:
+            return limit + 1
+    return min(current[-1], limit + 1)
+
+
+def _gallop(seq, target, lo=0):
+    """First index >= lo whose value is >= target in a sorted sequence
+
+    Probes lo+1, lo+2, lo+4, ... before a binary search, so stepping through a long
+    list towards nearby targets costs O(log distance) instead of O(log n).
+    """
+    step = 1
+    hi = lo
+    while hi < len(seq) and seq[hi] < target:
+        lo = hi + 1
+        hi += step
+        step *= 2
+    return bisect_left(seq, target, lo, min(hi, len(seq)))
+
+
+def _intersect(lists):
+    """Sorted values present in every sorted list (galloping from the shortest)"""
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    cursors = [0] * len(lists)
+    result = []
+    for value in lists[0]:
+        for i in range(1, len(lists)):
+            cursors[i] = _gallop(lists[i], value, cursors[i])
+            if cursors[i] == len(lists[i]):
+                return result
+            if lists[i][cursors[i]] != value:
+                break
+        else:
+            result.append(value)
+    return result
+
+
+def _import_numpy():
+    """Return the numpy module, or None when it is not installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search (inverted-index scoring)
+
+    backend: "python" or "numpy" (None uses BM25_BACKEND). The numpy backend keeps
+    a sparse term-major matrix of precomputed BM25 weights and scores with
+    vectorized column adds; rankings and scores match the python engine exactly.
+    """
 
-    def __init__(self, k1=1.5, b=0.75):
+    def __init__(self, k1=1.5, b=0.75, backend=None):
         self.k1 = k1
         self.b = b
+        self.backend = backend
         self.corpus = []
         self.doc_lengths = []
+        self.doc_norms = []
         self.avgdl = 0
         self.idf = {}
         self.doc_freqs = defaultdict(int)
+        self.postings = {}
+        self.max_scores = {}
+        self.removed = set()  # doc ids dropped by remove(); slots keep later ids stable
         self.N = 0
+        self._matrix = None
+        self._trigrams = None
+        self._suffixes = None
+        self._positions = None
+
+    def __getstate__(self):
+        # The numpy matrix, trigram, suffix and position indexes are derived data; keep pickled indexes small and numpy-free
+        state = self.__dict__.copy()
+        state["_matrix"] = None
+        state["_trigrams"] = None
+        state["_suffixes"] = None
+        state["_positions"] = None
+        return state
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        return _tokenize(text)
 
     def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        """Build BM25 index and term -> (doc ids, term freqs) postings from documents"""
+        self.corpus = []
+        self.doc_lengths = []
+        self.doc_freqs = defaultdict(int)
+        self.postings = {}
+        self.removed = set()
+        for doc in documents:
+            self._index_document(len(self.corpus), self.tokenize(doc))
+        self._refresh()
+
+    # ---- incremental maintenance ----
+    def add(self, documents):
+        """Append documents to a fitted index; returns their doc ids"""
+        start = len(self.corpus)
+        for doc in documents:
+            self._index_document(len(self.corpus), self.tokenize(doc))
+        self._refresh()
+        return list(range(start, len(self.corpus)))
+
+    def remove(self, doc_ids):
+        """Drop documents; their ids are never reused or returned by searches again"""
+        for doc_id in doc_ids:
+            if doc_id not in self.removed:
+                self._unindex_document(doc_id)
+                self.removed.add(doc_id)
+        self._refresh()
+
+    def update(self, documents):
+        """Replace the text of existing documents, given as {doc id: document}"""
+        for doc_id, doc in documents.items():
+            self._unindex_document(doc_id)
+            self._index_document(doc_id, self.tokenize(doc))
+        self._refresh()
+
+    def _index_document(self, doc_id, tokens):
+        """Add one tokenized document (new at the end, or re-added in its old slot) to the postings"""
+        if doc_id == len(self.corpus):
+            self.corpus.append(tokens)
+            self.doc_lengths.append(len(tokens))
+        else:
+            self.corpus[doc_id] = tokens
+            self.doc_lengths[doc_id] = len(tokens)
+
+        term_freqs = defaultdict(int)
+        for word in tokens:
+            term_freqs[word] += 1
+        for word, tf in term_freqs.items():
+            self.doc_freqs[word] += 1
+            doc_ids, tfs = self.postings.setdefault(word, ([], []))
+            if not doc_ids or doc_ids[-1] < doc_id:
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+            else:
+                # Postings stay sorted by doc id, which top_k() relies on
+                pos = bisect_left(doc_ids, doc_id)
+                doc_ids.insert(pos, doc_id)
+                tfs.insert(pos, tf)
+
+    def _unindex_document(self, doc_id):
+        """Remove one document's terms from the postings and document frequencies"""
+        for word in set(self.corpus[doc_id]):
+            doc_ids, tfs = self.postings[word]
+            pos = bisect_left(doc_ids, doc_id)
+            del doc_ids[pos]
+            del tfs[pos]
+            self.doc_freqs[word] -= 1
+            if not doc_ids:
+                del self.postings[word]
+                del self.doc_freqs[word]
+        self.corpus[doc_id] = []
+        self.doc_lengths[doc_id] = 0
+
+    def set_collection(self, n, total_length, doc_freqs):
+        """Score as one shard of a larger collection (see shards.py)
+
+        n, total_length and doc_freqs describe the whole collection; IDF and length
+        norms then use them instead of this index's own documents, so a document's
+        score equals its score in a single index over the full collection.
+        """
+        self._refresh((n, total_length, doc_freqs))
+
+    def _refresh(self, collection=None):
+        """Recompute the collection statistics that depend on N and avgdl
+
+        Tokenizing and postings are maintained per changed document; IDF, length
+        norms and MaxScore bounds are cheap arithmetic over the existing postings,
+        so scores stay identical to a fresh fit() of the same documents.
+        """
+        if collection is None:
+            # Removed slots have length 0, so the sum covers live documents only
+            collection = (len(self.corpus) - len(self.removed), sum(self.doc_lengths), self.doc_freqs)
+        self.N, total_length, doc_freqs = collection
+        self.idf = {}
+        self.max_scores = {}
+        self._matrix = None
+        self._trigrams = None
+        self._suffixes = None
+        self._positions = None
         if self.N == 0:
+            self.avgdl = 0
+            self.doc_norms = []
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
+        self.avgdl = total_length / self.N
+        # Length normalisation part of the BM25 denominator, fixed per document
+        self.doc_norms = [self.k1 * (1 - self.b + self.b * doc_len / self.avgdl) for doc_len in self.doc_lengths]
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
-
-        for word, freq in self.doc_freqs.items():
+        for word in self.doc_freqs:
+            freq = doc_freqs[word]
             self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
 
+        # Per-term score upper bounds for dynamic pruning in top_k()
+        k1_plus_1 = self.k1 + 1
+        for word, (doc_ids, tfs) in self.postings.items():
+            idf = self.idf[word]
+            self.max_scores[word] = max(idf * (tf * k1_plus_1) / (tf + self.doc_norms[doc_id])
+                                        for doc_id, tf in zip(doc_ids, tfs))
+
     def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        """Score all documents against query, touching only the query terms' postings"""
+        matrix = self._numpy_matrix()
+        if matrix is not None:
+            np = matrix["np"]
+            scores = self._numpy_scores(matrix, [(token, 1) for token in self.tokenize(query)])
+            order = np.lexsort((np.arange(len(scores)), -scores))
+            return [(int(doc), float(scores[doc])) for doc in order if int(doc) not in self.removed]
+
+        scores = [0] * len(self.doc_norms)
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+
+        for token in self.tokenize(query):
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            idf = self.idf[token]
+            for doc_id, tf in zip(*postings):
+                scores[doc_id] += idf * (tf * k1_plus_1) / (tf + doc_norms[doc_id])
+
+        ranked = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
+        return [pair for pair in ranked if pair[0] not in self.removed] if self.removed else ranked
+
+    def top_k(self, query, k):
+        """Top k (doc id, score) pairs with score > 0, using MaxScore pruning
 
-        for idx, doc in enumerate(self.corpus):
+        Returns exactly the positive-score head of score(query)[:k]. Documents are
+        visited in doc id order; query terms whose summed upper bounds cannot beat
+        the current k-th score are only probed for candidates found via other terms.
+        """
+        return self.top_k_terms([(token, 1) for token in self.tokenize(query)], k)
+
+    def top_k_terms(self, terms, k):
+        """top_k() for a weighted query: (term, weight) pairs, e.g. from expand()
+
+        Each term's contribution to a document's score is multiplied by its weight;
+        with every weight 1 this is exactly top_k().
+        """
+        terms = [(token, weight) for token, weight in terms if token in self.postings]
+        if k <= 0 or not terms:
+            return []
+
+        matrix = self._numpy_matrix()
+        if matrix is not None:
+            return self._numpy_top_k(matrix, self._numpy_scores(matrix, terms), k)
+
+        query_terms = terms
+        counts = {}
+        for token, weight in query_terms:
+            counts[token] = counts.get(token, 0) + weight
+        # Ascending upper bound: a prefix of these terms forms the non-essential set
+        terms = sorted(counts, key=lambda t: counts[t] * self.max_scores[t])
+        bounds = []
+        total = 0.0
+        for term in terms:
+            total += counts[term] * self.max_scores[term]
+            bounds.append(total)
+
+        postings = [self.postings[t] for t in terms]
+        cursors = [0] * len(terms)
+        idf = [self.idf[t] for t in terms]
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+        slack = 1 + 1e-9  # guards pruning decisions against float rounding
+
+        heap = []
+        threshold = 0.0
+        first_essential = 0
+        end = len(doc_norms)
+        while first_essential < len(terms):
+            doc = end
+            for i in range(first_essential, len(terms)):
+                doc_ids = postings[i][0]
+                if cursors[i] < len(doc_ids) and doc_ids[cursors[i]] < doc:
+                    doc = doc_ids[cursors[i]]
+            if doc == end:
+                break
+
+            contribs = {}
+            partial = 0.0
+            for i in range(first_essential, len(terms)):
+                doc_ids, tfs = postings[i]
+                if cursors[i] < len(doc_ids) and doc_ids[cursors[i]] == doc:
+                    tf = tfs[cursors[i]]
+                    contrib = idf[i] * (tf * k1_plus_1) / (tf + doc_norms[doc])
+                    contribs[terms[i]] = contrib
+                    partial += counts[terms[i]] * contrib
+                    cursors[i] += 1
+
+            pruned = False
+            for i in range(first_essential - 1, -1, -1):
+                if (partial + bounds[i]) * slack < threshold:
+                    pruned = True
+                    break
+                doc_ids, tfs = postings[i]
+                cursors[i] = bisect_left(doc_ids, doc, cursors[i])
+                if cursors[i] < len(doc_ids) and doc_ids[cursors[i]] == doc:
+                    tf = tfs[cursors[i]]
+                    contrib = idf[i] * (tf * k1_plus_1) / (tf + doc_norms[doc])
+                    contribs[terms[i]] = contrib
+                    partial += counts[terms[i]] * contrib
+            if pruned or partial * slack < threshold:
+                continue
+
+            # Sum in query order so the score is bit-identical to score()
             score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+            for token, weight in query_terms:
+                if token in contribs:
+                    score += contribs[token] if weight == 1 else weight * contribs[token]
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -doc))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, -doc))
+            else:
+                continue
+            if len(heap) == k:
+                threshold = heap[0][0]
+                while first_essential < len(terms) and bounds[first_essential] * slack < threshold:
+                    first_essential += 1
 
-            scores.append((idx, score))
+        return [(-neg_doc, score) for score, neg_doc in sorted(heap, key=lambda x: (-x[0], -x[1]))]
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    def score_batch(self, queries, k):
+        """top_k() for many queries; vectorized into one score matrix on the numpy backend"""
+        matrix = self._numpy_matrix()
+        if matrix is None:
+            return [self.top_k(query, k) for query in queries]
 
+        np = matrix["np"]
+        results = []
+        # Bounded score matrix so tens of thousands of queries don't allocate queries x docs at once
+        for start in range(0, len(queries), 256):
+            chunk = queries[start:start + 256]
+            scores = np.zeros((len(chunk), len(self.doc_norms)))
+            for row, query in enumerate(chunk):
+                self._numpy_scores(matrix, [(token, 1) for token in self.tokenize(query)], out=scores[row])
+            results.extend(self._numpy_top_k(matrix, row_scores, k) for row_scores in scores)
+        return results
 
-# ============ SEARCH FUNCTIONS ============
-def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+    # ---- positional postings ----
+    def _position_index(self):
+        """Build (once) term -> token positions per posting entry, from the tokenized corpus"""
+        if self._positions is None:
+            positions = {}
+            for tokens in self.corpus:
+                doc_positions = {}
+                for pos, token in enumerate(tokens):
+                    doc_positions.setdefault(token, []).append(pos)
+                # Documents are visited in doc id order, so entries line up with the postings
+                for token, token_positions in doc_positions.items():
+                    positions.setdefault(token, []).append(token_positions)
+            self._positions = positions
+        return self._positions
 
+    def term_positions(self, term, entry):
+        """Token positions of term in the document at postings[term][0][entry]"""
+        return self._position_index()[term][entry]
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
+    def phrase_docs(self, tokens):
+        """Sorted doc ids containing tokens as consecutive terms"""
+        postings = [self.postings.get(token) for token in tokens]
+        if not tokens or any(p is None for p in postings):
+            return []
+        docs = _intersect([doc_ids for doc_ids, _ in postings])
+        if len(tokens) == 1:
+            return docs
+        cursors = [0] * len(tokens)
+        matches = []
+        for doc in docs:
+            starts = None
+            for i, token in enumerate(tokens):
+                cursors[i] = _gallop(postings[i][0], doc, cursors[i])
+                shifted = {pos - i for pos in self.term_positions(token, cursors[i])}
+                starts = shifted if starts is None else starts & shifted
+                if not starts:
+                    break
+            if starts:
+                matches.append(doc)
+        return matches
+
+    def score_docs(self, terms, doc_ids):
+        """BM25 scores of the given sorted doc ids for (term, weight) pairs, as (doc id, score) pairs
+
+        Contributions are summed in query term order, so each score equals
+        score()'s (top_k_terms()'s for weighted terms).
+        """
+        scores = [0] * len(doc_ids)
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+        for token, weight in terms:
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            posting_docs, tfs = postings
+            idf = self.idf[token]
+            cursor = 0
+            for i, doc in enumerate(doc_ids):
+                cursor = _gallop(posting_docs, doc, cursor)
+                if cursor == len(posting_docs):
+                    break
+                if posting_docs[cursor] == doc:
+                    tf = tfs[cursor]
+                    contrib = idf * (tf * k1_plus_1) / (tf + doc_norms[doc])
+                    scores[i] += contrib if weight == 1 else weight * contrib
+        return list(zip(doc_ids, scores))
+
+    def top_k_within(self, terms, k, doc_ids):
+        """top_k_terms() restricted to the sorted doc ids, e.g. the rows passing column filters
+
+        Only documents containing a query term are scored: the union of the terms'
+        postings is intersected with doc_ids, galloping through the longer list.
+        """
+        present = [self.postings[token][0] for token, _ in terms if token in self.postings]
+        if k <= 0 or not present or not doc_ids:
+            return []
+        matching = list(present[0]) if len(present) == 1 else sorted(set().union(*present))
+        ranked = [pair for pair in self.score_docs(terms, _intersect([matching, doc_ids])) if pair[1] > 0]
+        return heapq.nsmallest(k, ranked, key=lambda pair: (-pair[1], pair[0]))
+
+    # ---- query expansion ----
+    def expand(self, query, fuzzy=False, partial=False):
+        """Weighted query terms for top_k_terms(); known tokens keep weight 1
+
+        partial: also add the vocabulary terms containing each token (see PARTIAL_EXPANSIONS)
+        fuzzy: replace a token that matched nothing by its nearest terms (see FUZZY_WEIGHT)
+        """
+        terms = []
+        for token in self.tokenize(query):
+            matched = [(token, 1)] if token in self.postings else []
+            if partial:
+                matched.extend(self._containing_terms(token, PARTIAL_EXPANSIONS))
+            if fuzzy and not matched:
+                matched = self._nearest_terms(token, FUZZY_EXPANSIONS)
+            terms.extend(matched)
+        return terms
+
+    def _suffix_array(self):
+        """Build (once) the sorted suffixes of all vocabulary terms and the term of each"""
+        if self._suffixes is None:
+            vocabulary = list(self.postings)
+            pairs = sorted((term[i:], term_id) for term_id, term in enumerate(vocabulary) for i in range(len(term)))
+            self._suffixes = (vocabulary, [suffix for suffix, _ in pairs], [term_id for _, term_id in pairs])
+        return self._suffixes
+
+    def _containing_terms(self, token, limit):
+        """Up to limit (term, weight) pairs for the other vocabulary terms containing token
+
+        The suffixes starting with token form one range of the suffix array, found
+        by two binary searches (O(m log n)). Weight is the share of the term the
+        token covers ("glass" in "glassmorphism": 5/13); best coverage first, then
+        the most frequent.
+        """
+        vocabulary, suffixes, owners = self._suffix_array()
+        start = bisect_left(suffixes, token)
+        end = bisect_left(suffixes, token + "\U0010ffff", start)
+        candidates = []
+        for term_id in {owners[i] for i in range(start, end)}:
+            term = vocabulary[term_id]
+            if term != token:
+                candidates.append((-len(token) / len(term), -self.doc_freqs[term], term))
+        candidates.sort()
+        return [(term, -coverage) for coverage, _, term in candidates[:limit]]
+
+    # ---- typo tolerance ----
+
+    def _trigram_index(self):
+        """Build (once) the vocabulary and trigram -> vocabulary positions"""
+        if self._trigrams is None:
+            vocabulary = list(self.postings)
+            grams = defaultdict(list)
+            for term_id, term in enumerate(vocabulary):
+                for gram in _trigrams(term):
+                    grams[gram].append(term_id)
+            self._trigrams = (vocabulary, dict(grams))
+        return self._trigrams
+
+    def _nearest_terms(self, token, limit):
+        """Up to limit (term, weight) pairs within FUZZY_MAX_DISTANCE edits of token
+
+        Only terms sharing trigrams with token are considered: a substitution,
+        insertion or deletion changes at most 3 trigrams and an adjacent
+        transposition at most 4, so a term within d edits shares at least
+        len(grams) - 4d. Short tokens leave that bound at 0 ("falt" and "flat"
+        share none), so transpositions are also undone explicitly: a term one
+        transposition plus e other edits away shares len(grams) - 3e trigrams
+        with the swapped token, and one that is only swaps away is looked up
+        directly. Closest terms first, then the most frequent.
+        """
+        vocabulary, grams = self._trigram_index()
+        max_distance = FUZZY_MAX_DISTANCE if len(token) > 4 else 1
+
+        def sharing(word, max_changed):
+            word_grams = _trigrams(word)
+            shared = defaultdict(int)
+            for gram in word_grams:
+                for term_id in grams.get(gram, ()):
+                    shared[term_id] += 1
+            min_shared = max(1, len(word_grams) - max_changed)
+            return {vocabulary[term_id] for term_id, count in shared.items() if count >= min_shared}
+
+        def swapped(word, i):
+            return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+        terms = sharing(token, 4 * max_distance)
+        swaps = [i for i in range(len(token) - 1) if token[i] != token[i + 1]]
+        for i in swaps:
+            variant = swapped(token, i)
+            if max_distance == 1:
+                terms.update([variant] if variant in self.postings else [])
+                continue
+            terms |= sharing(variant, 3 * (max_distance - 1))
+            # Two swaps, also overlapping ones: "deats" -> "daets" -> "dates" (a deletion and an insertion)
+            terms.update(twice for twice in (swapped(variant, j) for j in range(len(variant) - 1) if j != i)
+                         if twice in self.postings)
+
+        candidates = []
+        for term in terms:
+            distance = _edit_distance(token, term, max_distance)
+            if distance <= max_distance:
+                candidates.append((distance, -self.doc_freqs[term], term))
+        candidates.sort()
+        return [(term, FUZZY_WEIGHT ** distance) for distance, _, term in candidates[:limit]]
+
+    # ---- numpy backend ----
+    def _numpy_matrix(self):
+        """Build (once) the term-major CSR weight matrix; None on the python backend"""
+        if self._matrix is not None:
+            return self._matrix
+        if (self.backend or BM25_BACKEND) != "numpy" or self.N == 0:
+            return None
+        np = _import_numpy()
+        if np is None:
+            return None
+
+        k1_plus_1 = self.k1 + 1
+        doc_norms = np.asarray(self.doc_norms, dtype=np.float64)
+        rows = {}
+        indptr = [0]
+        indices = []
+        weights = []
+        for term, (doc_ids, tfs) in self.postings.items():
+            rows[term] = len(rows)
+            doc_ids = np.asarray(doc_ids, dtype=np.int64)
+            tfs = np.asarray(tfs, dtype=np.float64)
+            # Same expression as the python engine, so weights are bit-identical
+            weights.append(self.idf[term] * (tfs * k1_plus_1) / (tfs + doc_norms[doc_ids]))
+            indices.append(doc_ids)
+            indptr.append(indptr[-1] + len(doc_ids))
+        self._matrix = {
+            "np": np,
+            "rows": rows,
+            "indptr": np.asarray(indptr, dtype=np.int64),
+            "indices": np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+            "weights": np.concatenate(weights) if weights else np.zeros(0, dtype=np.float64)
+        }
+        return self._matrix
+
+    def _numpy_scores(self, matrix, terms, out=None):
+        """Sparse matrix-vector product of the weight matrix with a query term-weight vector
+
+        Term rows are added in query token order so float sums match score().
+        """
+        np = matrix["np"]
+        scores = np.zeros(len(self.doc_norms)) if out is None else out
+        rows, indptr, indices, weights = matrix["rows"], matrix["indptr"], matrix["indices"], matrix["weights"]
+        for token, weight in terms:
+            row = rows.get(token)
+            if row is not None:
+                start, end = indptr[row], indptr[row + 1]
+                # Doc ids are unique within a row, so fancy-index add is safe
+                scores[indices[start:end]] += weights[start:end] if weight == 1 else weight * weights[start:end]
+        return scores
+
+    def _numpy_top_k(self, matrix, scores, k):
+        """argpartition top k of a score vector, ordered like the python engine"""
+        np = matrix["np"]
+        if k <= 0:
+            return []
+        if k < self.N:
+            kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+            # Keep every document tied with the k-th score, then break ties by doc id
+            candidates = np.flatnonzero(scores >= max(kth, np.finfo(np.float64).tiny))
+        else:
+            candidates = np.flatnonzero(scores > 0)
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        return [(int(doc), float(scores[doc])) for doc in candidates[order]]
+
+
+# ============ ROW STORE ============
+class ColumnStore:
+    """Column-oriented table of CSV rows
+
+    Only the requested columns are kept, one list of values per (interned) column
+    name; short repeated values (Severity, Platform, Category, ...) are interned so
+    rows share them. Rows are materialized as dicts only when returned.
+    """
+
+    INTERN_MAX_LEN = 40
 
-    data = _load_csv(filepath)
+    def __init__(self, columns, size):
+        self.columns = columns
+        self.size = size
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    @classmethod
+    def from_csv(cls, filepath, columns):
+        """Load the given columns of a CSV (missing columns are skipped)
 
-    # BM25 search
+        Mirrors csv.DictReader: blank lines are skipped and short rows yield None.
+        """
+        import csv
+        with open(filepath, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            positions = {name: i for i, name in enumerate(header)}
+            wanted = [(sys.intern(name), positions[name]) for name in dict.fromkeys(columns) if name in positions]
+            values = {name: [] for name, _ in wanted}
+            size = 0
+            for row in reader:
+                if not row:
+                    continue
+                size += 1
+                for name, pos in wanted:
+                    value = row[pos] if pos < len(row) else None
+                    if value is not None and len(value) <= cls.INTERN_MAX_LEN:
+                        value = sys.intern(value)
+                    values[name].append(value)
+        return cls(values, size)
+
+    def __len__(self):
+        return self.size
+
+    def text(self, idx, cols):
+        """Space-joined values of cols for one row (the BM25 document)"""
+        return " ".join(str(self.columns[col][idx]) if col in self.columns else "" for col in cols)
+
+    def row(self, idx, cols):
+        """Materialize one row as a dict restricted to cols present in the store"""
+        return {col: self.columns[col][idx] for col in cols if col in self.columns}
+
+    def values(self, idx):
+        """All stored values of one row, in column order (hashable, for row diffs)"""
+        return tuple(values[idx] for values in self.columns.values())
+
+    def set_row(self, idx, other, other_idx):
+        """Overwrite row idx (or append when idx == len) with a row of a same-column store"""
+        for name, values in self.columns.items():
+            value = other.columns[name][other_idx]
+            if idx == self.size:
+                values.append(value)
+            else:
+                values[idx] = value
+        if idx == self.size:
+            self.size += 1
+
+
+# ============ INDEX CACHE ============
+class _RWLock:
+    """Reader/writer lock: many concurrent readers, one exclusive writer"""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writing = True
+
+    def release_write(self):
+        with self._cond:
+            self._writing = False
+            self._cond.notify_all()
+
+
+class IndexRegistry:
+    """Process-wide indexes shared read-only by all threads
+
+    Entries are key -> (fingerprint, index). Lookups take the read lock; a stale or
+    missing entry is built by exactly one thread per key (others asking for the
+    same key wait for it, other keys stay readable) and then swapped in under the
+    write lock, so readers see either the old or the new index, never a partial one.
+    Published indexes are never mutated; refreshes build new objects.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = _RWLock()
+        self._build_locks = {}
+        self._build_locks_guard = threading.Lock()
+        self.builds = 0
+
+    def _lookup(self, key, fingerprint):
+        self._lock.acquire_read()
+        try:
+            entry = self._entries.get(key)
+        finally:
+            self._lock.release_read()
+        return entry if entry is not None and entry[0] == fingerprint else None
+
+    def get(self, key, fingerprint, build):
+        """Index for key at fingerprint, calling build() once when missing or stale"""
+        entry = self._lookup(key, fingerprint)
+        if entry is not None:
+            return entry[1]
+
+        with self._build_locks_guard:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            entry = self._lookup(key, fingerprint)  # built by another thread meanwhile
+            if entry is not None:
+                return entry[1]
+            index = build()
+            self._lock.acquire_write()
+            try:
+                self._entries[key] = (fingerprint, index)
+                self.builds += 1
+            finally:
+                self._lock.release_write()
+        return index
+
+    def clear(self):
+        """Drop every index (the next lookups rebuild or reload them)"""
+        self._lock.acquire_write()
+        try:
+            self._entries.clear()
+        finally:
+            self._lock.release_write()
+
+
+_INDEX_REGISTRY = IndexRegistry()
+
+
+def _file_fingerprint(filepath):
+    """Return (size, mtime_ns) of a file for cheap change detection"""
+    stat = filepath.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _file_hash(filepath):
+    """Return SHA-256 of file contents"""
+    import hashlib
+    with open(filepath, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _index_path(filepath):
+    """Location of the compiled index artifact for a CSV"""
+    try:
+        name = filepath.relative_to(DATA_DIR).as_posix()
+    except ValueError:
+        name = filepath.name
+    return INDEX_DIR / (name.replace("/", "__") + ".idx")
+
+
+def _read_index(index_path):
+    """Read a compiled index artifact, None if missing or unreadable"""
+    import pickle
+    try:
+        artifact = pickle.loads(index_path.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get("version") != INDEX_VERSION:
+        return None
+    return artifact
+
+
+def _write_index(index_path, artifact):
+    """Atomically write a compiled index artifact (best effort)"""
+    import pickle
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(pickle.dumps(artifact, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _build_index(filepath, search_cols, output_cols):
+    """Load the needed CSV columns and fit a fresh BM25 index over the search columns"""
+    store = ColumnStore.from_csv(filepath, list(search_cols) + list(output_cols))
+    _lap("csv")
+    bm25 = BM25()
+    bm25.fit([store.text(idx, search_cols) for idx in range(len(store))])
+    _lap("fit")
+    return store, bm25
+
+
+def _load_index(filepath, search_cols, output_cols):
+    """Return (store, bm25) for a CSV, reusing the compiled artifact when the CSV is unchanged
+
+    Indexes live in the process-wide registry (shared by all threads) and are
+    reloaded as soon as the CSV's size or mtime changes, so long-lived hosts pick
+    up edits without restarting.
+    """
+    size, mtime_ns = _file_fingerprint(filepath)
+    key = (str(filepath), tuple(search_cols), tuple(output_cols))
+    return _INDEX_REGISTRY.get(key, (size, mtime_ns),
+                               lambda: _load_index_artifact(filepath, search_cols, output_cols, size, mtime_ns))
+
+
+def _open_bundle():
+    """Memoized compiled bundle (see bundle.py), None when not built; reopened when rebuilt"""
+    try:
+        fingerprint = _file_fingerprint(BUNDLE_PATH)
+    except OSError:
+        return None
+
+    def build():
+        from bundle import open_bundle
+        return open_bundle(BUNDLE_PATH)
+    return _INDEX_REGISTRY.get("bundle", fingerprint, build)
+
+
+def _rebuild_bundle():
+    """Rebuild the bundle (BUNDLE_AUTO_BUILD) and return it, None when that is not possible
+
+    The first process creates BUNDLE_PATH.lock and compiles; concurrent workers wait
+    for the lock to go away and then map the new file, so N workers starting on
+    changed data build once and share the result.
+    """
+    lock_path = BUNDLE_PATH.with_name(BUNDLE_PATH.name + ".lock")
+    try:
+        BUNDLE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        deadline = time.monotonic() + BUNDLE_LOCK_TIMEOUT
+        while lock_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return _open_bundle()
+    except OSError:
+        return None  # read-only install: per-dataset artifacts only
+    try:
+        from bundle import build_bundle
+        build_bundle(DATA_DIR, BUNDLE_PATH)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+        try:
+            os.unlink(lock_path)
+        except OSError:
+            pass
+    return _open_bundle()
+
+
+def _load_bundled_index(filepath, search_cols, size, mtime_ns):
+    """(store, bm25) from the compiled bundle when it holds an up-to-date entry for the CSV"""
+    try:
+        rel = filepath.relative_to(DATA_DIR).as_posix()
+    except ValueError:
+        return None
+
+    def usable(bundle):
+        """None: missing or stale (a rebuild helps), False: no index for these columns"""
+        entry = bundle.dataset(DATA_DIR, rel) if bundle is not None else None
+        if entry is None or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+            return None
+        return entry["bm25"] is not None and entry["search_cols"] == list(search_cols)
+
+    bundle = _open_bundle()
+    fresh = usable(bundle)
+    if fresh is None and BUNDLE_AUTO_BUILD:
+        bundle = _rebuild_bundle()
+        fresh = usable(bundle)
+    if not fresh:
+        return None
+    return bundle.store(DATA_DIR, rel), bundle.bm25(DATA_DIR, rel)
+
+
+def _update_index(filepath, search_cols, output_cols, store, bm25):
+    """Apply a row-level diff of the CSV to a cached (store, bm25) in place
+
+    Rows are matched in order against the index's live documents: edited rows keep
+    their doc id, deleted rows become removed ids and rows added at the end get new
+    ids, so doc ids stay in CSV order (ranking ties break the same way as a refit).
+    Returns False, leaving the index untouched, when a full rebuild is needed
+    instead: columns changed, rows were inserted before existing ones, or removed
+    ids would make up more than a quarter of the index.
+    """
+    from difflib import SequenceMatcher
+
+    fresh = ColumnStore.from_csv(filepath, list(search_cols) + list(output_cols))
+    _lap("csv")
+    if list(fresh.columns) != list(store.columns):
+        return False
+    live = [doc_id for doc_id in range(len(store)) if doc_id not in bm25.removed]
+    old_rows = [store.values(doc_id) for doc_id in live]
+    new_rows = [fresh.values(idx) for idx in range(len(fresh))]
+
+    updated = {}
+    removed = []
+    appended = []
+    matcher = SequenceMatcher(None, old_rows, new_rows, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        common = min(i2 - i1, j2 - j1)
+        for offset in range(common):
+            updated[live[i1 + offset]] = j1 + offset
+        removed.extend(live[i1 + common:i2])
+        if j1 + common < j2:
+            if i2 != len(old_rows):
+                return False
+            appended.extend(range(j1 + common, j2))
+
+    if (len(bm25.removed) + len(removed)) * 4 > len(store) + len(appended):
+        return False
+
+    for doc_id, idx in updated.items():
+        store.set_row(doc_id, fresh, idx)
+    for idx in appended:
+        store.set_row(len(store), fresh, idx)
+    bm25.remove(removed)
+    bm25.update({doc_id: store.text(doc_id, search_cols) for doc_id in updated})
+    bm25.add([fresh.text(idx, search_cols) for idx in appended])
+    _lap("fit")
+    return True
+
+
+def _load_index_artifact(filepath, search_cols, output_cols, size, mtime_ns):
+    """Read the bundle entry or on-disk artifact for a CSV, refitting and rewriting it when stale"""
+    bundled = _load_bundled_index(filepath, search_cols, size, mtime_ns)
+    if bundled is not None:
+        return bundled
+
+    index_path = _index_path(filepath)
+    columns = [list(search_cols), list(output_cols)]
+
+    artifact = _read_index(index_path)
+    if artifact is not None and artifact["columns"] == columns:
+        if artifact["size"] == size and artifact["mtime_ns"] == mtime_ns:
+            return artifact["store"], artifact["bm25"]
+        # Touched but possibly unchanged: compare content before refitting
+        sha256 = _file_hash(filepath)
+        if artifact["size"] == size and artifact["sha256"] == sha256:
+            artifact["mtime_ns"] = mtime_ns
+            _write_index(index_path, artifact)
+            return artifact["store"], artifact["bm25"]
+        # Rows appended, edited or deleted: patch the index instead of refitting
+        if _update_index(filepath, search_cols, output_cols, artifact["store"], artifact["bm25"]):
+            artifact.update(size=size, mtime_ns=mtime_ns, sha256=sha256)
+            _write_index(index_path, artifact)
+            return artifact["store"], artifact["bm25"]
+
+    store, bm25 = _build_index(filepath, search_cols, output_cols)
+    _write_index(index_path, {
+        "version": INDEX_VERSION,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "sha256": _file_hash(filepath),
+        "columns": columns,
+        "store": store,
+        "bm25": bm25
+    })
+    return store, bm25
+
+
+def _federated_sources(data_dir=None):
+    """Every dataset of the federated index: CSV_CONFIG domains, then STACK_CONFIG stacks"""
+    data_dir = DATA_DIR if data_dir is None else data_dir
+    sources = []
+    for domain, config in CSV_CONFIG.items():
+        sources.append({"key": domain, "domain": domain, "file": config["file"],
+                        "search_cols": config["search_cols"], "output_cols": config["output_cols"]})
+    for stack, config in STACK_CONFIG.items():
+        sources.append({"key": f"stack:{stack}", "domain": "stack", "stack": stack, "file": config["file"],
+                        "search_cols": _STACK_COLS["search_cols"], "output_cols": _STACK_COLS["output_cols"]})
+    return [source for source in sources if (data_dir / source["file"]).exists()]
+
+
+def _load_federated_index():
+    """Return (sources, doc_sources, stores, bm25) for one index over all datasets
+
+    Documents are numbered consecutively across sources; doc_sources[i] is
+    (source position, row in that source's store). The artifact is rebuilt when any
+    dataset's size/mtime changes.
+    """
+    sources = _federated_sources()
+    fingerprints = [(source["file"], *_file_fingerprint(DATA_DIR / source["file"])) for source in sources]
+    return _INDEX_REGISTRY.get("federated", fingerprints, lambda: _load_federated_artifact(sources, fingerprints))
+
+
+def _load_federated_artifact(sources, fingerprints):
+    """Read the bundle entry or federated artifact, refitting and rewriting it when any dataset changed"""
+    bundle = _open_bundle()
+    federated = bundle.federated(DATA_DIR, sources, fingerprints) if bundle is not None else None
+    if federated is None and BUNDLE_AUTO_BUILD:
+        bundle = _rebuild_bundle()
+        federated = bundle.federated(DATA_DIR, sources, fingerprints) if bundle is not None else None
+    if federated is not None:
+        return federated
+
+    index_path = INDEX_DIR / "federated.idx"
+    artifact = _read_index(index_path)
+    if artifact is not None and artifact["sources"] == sources and artifact["fingerprints"] == fingerprints:
+        return artifact["sources"], artifact["doc_sources"], artifact["stores"], artifact["bm25"]
+
+    stores = []
+    doc_sources = []
+    documents = []
+    for source_id, source in enumerate(sources):
+        store = ColumnStore.from_csv(DATA_DIR / source["file"], source["search_cols"] + source["output_cols"])
+        stores.append(store)
+        for idx in range(len(store)):
+            doc_sources.append((source_id, idx))
+            documents.append(store.text(idx, source["search_cols"]))
     bm25 = BM25()
     bm25.fit(documents)
-    ranked = bm25.score(query)
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+    _write_index(index_path, {
+        "version": INDEX_VERSION,
+        "sources": sources,
+        "fingerprints": fingerprints,
+        "doc_sources": doc_sources,
+        "stores": stores,
+        "bm25": bm25
+    })
+    return sources, doc_sources, stores, bm25
+
+
+# ============ QUERY CACHE ============
+class QueryCache:
+    """Bounded LRU cache of search results
+
+    Keys are (INDEX_VERSION, dataset file, normalized query tokens, max_results,
+    search backend, fuzzy, partial, column filters), so results cached by an older
+    engine are never served after an upgrade.
+    Each entry stores the fingerprint of the backing CSV and is dropped as soon as
+    the CSV changes (or its TTL expires). With a path, entries are also shared with
+    other processes through a small pickle file, read on first use and merged and
+    rewritten once at interpreter exit (write-behind), not on every miss. One
+    instance may be used from several threads.
+    """
+
+    def __init__(self, max_size=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL, path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._loaded = path is None
+        self._dirty = False  # entries added since the last save()
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # serializes file writes without blocking get()/put()
+        if path is not None:
+            import atexit
+            atexit.register(self.save)
+
+    def get(self, key, fingerprint):
+        """Cached results for key, or None when missing, stale or expired"""
+        with self._lock:
+            self._load()
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry_fingerprint, stored_at, results = entry
+                if entry_fingerprint == fingerprint and (self.ttl is None or time.time() - stored_at <= self.ttl):
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return [dict(row) for row in results]
+                del self.entries[key]
+                self.invalidations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, fingerprint, results):
+        """Store results for key; the shared file is written by save() (at exit)"""
+        with self._lock:
+            self._load()
+            self.entries[key] = (fingerprint, time.time(), [dict(row) for row in results])
+            self.entries.move_to_end(key)
+            self._trim()
+            self._dirty = True
+
+    def stats(self):
+        """Hit/miss counters for instrumentation"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self.entries),
+            "max_size": self.max_size
+        }
+
+    def clear(self):
+        """Drop all entries (including the shared file) and reset counters"""
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+            self._dirty = False
+            if self.path is not None:
+                try:
+                    self.path.unlink()
+                except OSError:
+                    pass
 
+    def _trim(self):
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read_file(self):
+        import pickle
+        try:
+            entries = pickle.loads(self.path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        for key, entry in self._read_file().items():
+            self.entries.setdefault(key, entry)
+        self._trim()
+
+    def save(self):
+        """Write new entries to the shared file (no-op for in-memory caches or when nothing changed)"""
+        with self._save_lock:
+            # Snapshot under the lock, do the file I/O outside it
+            with self._lock:
+                if self.path is None or not self._dirty:
+                    return
+                self._dirty = False
+                snapshot = list(self.entries.items())
+            # Merge what other processes wrote since we loaded, ours win on conflicts
+            merged = OrderedDict(self._read_file())
+            for key, entry in snapshot:
+                merged.pop(key, None)
+                merged[key] = entry
+            while len(merged) > self.max_size:
+                merged.popitem(last=False)
+            _write_index(self.path, merged)
+
+
+def _make_query_cache():
+    if QUERY_CACHE_MODE == "off":
+        return None
+    path = INDEX_DIR / "query-cache.pkl" if QUERY_CACHE_MODE == "disk" else None
+    return QueryCache(path=path)
+
+
+_QUERY_CACHE = _make_query_cache()
+
+
+def prefer_memory_query_cache():
+    """Switch the query cache to "memory" unless UI_UX_QUERY_CACHE chose a mode
+
+    For long-lived hosts: they keep their own cache warm, so the shared file would
+    only cost a read and a merge-and-rewrite.
+    """
+    global QUERY_CACHE_MODE, _QUERY_CACHE
+    if "UI_UX_QUERY_CACHE" in os.environ or QUERY_CACHE_MODE != "disk":
+        return
+    QUERY_CACHE_MODE = "memory"
+    _QUERY_CACHE = _make_query_cache()
+
+
+def query_cache_stats():
+    """Hit/miss counters of the query result cache (None when disabled)"""
+    return _QUERY_CACHE.stats() if _QUERY_CACHE is not None else None
+
+
+def clear_query_cache():
+    """Empty the query result cache"""
+    if _QUERY_CACHE is not None:
+        _QUERY_CACHE.clear()
+
+
+def _dataset_name(filepath):
+    try:
+        return filepath.relative_to(DATA_DIR).as_posix()
+    except ValueError:
+        return str(filepath)
+
+
+def _query_cache_key(filepath, query, max_results, backend, fuzzy=False, partial=False, filters=None):
+    # Query-language operators change the results, so such queries are keyed verbatim
+    terms = (query.strip(),) if _is_structured(query) else tuple(_tokenize(query))
+    return INDEX_VERSION, _dataset_name(filepath), terms, max_results, backend, fuzzy, partial, filters
+
+
+# ============ TELEMETRY ============
+class Telemetry:
+    """Per-query stage timings appended to a rotating JSONL log
+
+    Every search records its dataset, domain, backend, token and result counts and
+    the milliseconds spent per stage: cache (result cache lookup and write), load (index
+    memo/bundle/artifact), csv and fit (only when the index had to be rebuilt or
+    patched), score (query parsing, tokenization and BM25 scoring with top-k
+    selection; the whole query on the sqlite backend) and project (result rows). Searches slower than slow_ms
+    are also appended to slow-queries.jsonl. Each log rotates at max_bytes.
+    """
+
+    def __init__(self, directory, slow_ms=SLOW_QUERY_MS, max_bytes=TELEMETRY_MAX_BYTES, backups=TELEMETRY_BACKUPS):
+        self.directory = Path(directory)
+        self.slow_ms = slow_ms
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.log_path = self.directory / "queries.jsonl"
+        self.slow_log_path = self.directory / "slow-queries.jsonl"
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        """Append one event (a dict) to the query log, and to the slow log when slow"""
+        import json
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._append(self.log_path, line)
+            if event["ms"] >= self.slow_ms:
+                self._append(self.slow_log_path, line)
+
+    def _append(self, path, line):
+        # Best effort, like the index cache: telemetry must never fail a search
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists() and path.stat().st_size + len(line) > self.max_bytes:
+                for i in range(self.backups - 1, 0, -1):
+                    older = path.with_name(f"{path.name}.{i}")
+                    if older.exists():
+                        os.replace(older, path.with_name(f"{path.name}.{i + 1}"))
+                os.replace(path, path.with_name(f"{path.name}.1"))
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError:
+            pass
+
+
+class _Trace:
+    """Stage timings of the search running on this thread"""
+    __slots__ = ("start", "last", "stages")
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.stages = {}
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.last)
+        self.last = now
+
+
+_TRACE = threading.local()
+_TELEMETRY = Telemetry(TELEMETRY_DIR) if TELEMETRY_DIR else None
+
+
+def _lap(stage):
+    """Close a telemetry stage of the current search (no-op when telemetry is off)"""
+    trace = getattr(_TRACE, "current", None)
+    if trace is not None:
+        trace.lap(stage)
+
+
+def enable_telemetry(directory, slow_ms=SLOW_QUERY_MS):
+    """Start writing per-query telemetry to directory"""
+    global _TELEMETRY
+    _TELEMETRY = Telemetry(directory, slow_ms)
+    return _TELEMETRY
+
+
+def disable_telemetry():
+    global _TELEMETRY
+    _TELEMETRY = None
+
+
+def _dataset_domain(name):
+    """Domain (or stack:<name>) of a dataset file"""
+    for domain, config in CSV_CONFIG.items():
+        if config["file"] == name:
+            return domain
+    for stack, config in STACK_CONFIG.items():
+        if config["file"] == name:
+            return f"stack:{stack}"
+    return None
+
+
+def _record_search(telemetry, trace, filepath, queries, output, pending, backend):
+    ms = (time.perf_counter() - trace.start) * 1000
+    name = _dataset_name(filepath)
+    event = {
+        "ts": round(time.time(), 3),
+        "dataset": name,
+        "domain": _dataset_domain(name),
+        "backend": backend,
+        "tokens": sum(len(_tokenize(query)) for query in queries),
+        "results": sum(len(results) for results in output),
+        "cached": len(queries) - len(pending),
+        "ms": round(ms, 3),
+        "stages": {stage: round(seconds * 1000, 3) for stage, seconds in trace.stages.items()}
+    }
+    if len(queries) == 1:
+        event["query"] = queries[0]
+    else:
+        event["queries"] = len(queries)
+    event["slow"] = ms >= telemetry.slow_ms
+    telemetry.record(event)
+
+
+# ============ KEYWORD ROUTING ============
+class KeywordMatcher:
+    """Scores categories by the keywords a text mentions, in one pass over the text
+
+    All keywords of all categories are compiled into a single regex alternation
+    (longest first). A keyword must start a word, so "ui" does not fire inside
+    "build", but may be inflected: "charting", "scrollable" and "memoized" count for
+    "chart", "scroll" and "memo". Keywords starting with a non-word character match
+    anywhere, so "#" still matches in "#1E40AF". A category's score is the number of
+    its distinct keywords found.
+    """
+
+    def __init__(self, table):
+        self.categories = list(table)
+        self._owners = defaultdict(list)  # keyword -> categories listing it
+        for category, keywords in table.items():
+            for keyword in dict.fromkeys(kw.lower() for kw in keywords):
+                self._owners[keyword].append(category)
+        keywords = sorted(self._owners, key=lambda kw: (-len(kw), kw))
+        # Keywords starting with a word character share one group anchored at the
+        # start of a word (any suffix may follow); the few others ("#") get one group each
+        bounded = [kw for kw in keywords if re.match(r"\w", kw)]
+        self._others = [kw for kw in keywords if kw not in set(bounded)]
+        alternatives = [rf"(?<!\w)({'|'.join(map(re.escape, bounded))})\w*"] if bounded else [r"(?!)()"]
+        alternatives += [f"({re.escape(keyword)})" for keyword in self._others]
+        self._pattern = re.compile("|".join(alternatives))
+
+    def scores(self, text):
+        """{category: number of its keywords in text} for every category, in table order"""
+        found = {category: set() for category in self.categories}
+        for match in self._pattern.finditer(text.lower()):
+            keyword = match.group(1) if match.lastindex == 1 else self._others[match.lastindex - 2]
+            for category in self._owners[keyword]:
+                found[category].add(keyword)
+        return {category: len(keywords) for category, keywords in found.items()}
+
+    def best(self, text, default=None):
+        """Highest-scoring category (the earlier one on ties), default when nothing matches"""
+        scores = self.scores(text)
+        best = max(scores, key=scores.get, default=None)
+        return best if best is not None and scores[best] > 0 else default
+
+
+_DOMAIN_MATCHER = KeywordMatcher({
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+})
+
+
+# ============ QUERY LANGUAGE ============
+# Anything beyond plain words: quotes, -exclusion, AND/OR, field:value
+_QUERY_SYNTAX = re.compile(r'"|(?:^|\s)-\S|(?:^|\s)(?:AND|OR)(?:\s|$)|\w:\S')
+_QUERY_ITEM = re.compile(r'(-?)(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+
+
+def _is_structured(query):
+    """True when query uses the query language (see parse_query)"""
+    return _QUERY_SYNTAX.search(query) is not None
+
+
+def _field_key(name):
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def parse_query(query, columns=()):
+    """Parse the query language into {"groups", "exclude", "tokens"}
+
+        "dark mode"        phrase: the words in this order
+        -neumorphism       exclude documents matching the term (or "-phrase", -field:value)
+        a AND b            both required; AND binds tighter than OR
+        a OR b, a b        either (plain words are OR-ed, as in free text)
+        type:dark          column value containing the words; the name matches
+                           a column case-insensitively, ignoring spaces ("style_category:")
+
+    A document matches when it satisfies every atom of at least one group and no
+    excluded atom; a query of exclusions only ("-flat") matches every document
+    without them. Atoms are ("term", token), ("phrase", tokens) and ("field",
+    column, words). tokens are the analyzed words used for BM25 ranking, in order.
+    Unknown fields are read as plain text.
+    """
+    fields = {_field_key(col): col for col in columns}
+    groups = []
+    exclude = []
+    tokens = []
+    joined = False  # previous item was AND
+    for match in _QUERY_ITEM.finditer(query):
+        negate, field, phrase, word = match.groups()
+        if not negate and field is None and phrase is None and word in ("AND", "OR"):
+            joined = word == "AND" and bool(groups)
+            continue
+        text = phrase if phrase is not None else word
+        column = fields.get(_field_key(field)) if field else None
+        if field and column is None:
+            text = f"{field} {text}"
+        analyzed = _tokenize(text)
+        if column is not None:
+            words = tuple(re.findall(r"\w+", text.lower()))
+            atoms = [("field", column, words)] if words else []
+        elif phrase is not None and len(analyzed) > 1:
+            atoms = [("phrase", tuple(analyzed))]
+        else:
+            atoms = [("term", token) for token in analyzed]
+        if not atoms:
+            continue
+        if negate:
+            exclude.extend(atoms)
+        else:
+            tokens.extend(analyzed)
+            if joined:
+                groups[-1].extend(atoms)
+            else:
+                groups.extend([atom] for atom in atoms)
+        joined = False
+    return {"groups": groups, "exclude": exclude, "tokens": tokens}
+
+
+def _is_free_text(parsed):
+    """True when a parsed query is just OR-ed terms, i.e. ranks exactly like free text"""
+    return not parsed["exclude"] and all(len(group) == 1 and group[0][0] == "term" for group in parsed["groups"])
+
+
+def _field_contains(value, words):
+    """True when the words occur consecutively in a column value"""
+    if value is None:
+        return False
+    value_words = re.findall(r"\w+", str(value).lower())
+    n = len(words)
+    return any(tuple(value_words[i:i + n]) == words for i in range(len(value_words) - n + 1))
+
+
+def _atom_docs(store, bm25, search_cols, atom, candidates=None):
+    """Sorted doc ids matching one atom, optionally restricted to sorted candidates"""
+    kind = atom[0]
+    if kind == "term":
+        postings = bm25.postings.get(atom[1])
+        docs = list(postings[0]) if postings is not None else []
+    elif kind == "phrase":
+        docs = bm25.phrase_docs(atom[1])
+    else:
+        _, column, words = atom
+        if candidates is None:
+            # Words of a search column are indexed: only their documents can match
+            analyzed = [token for token in _tokenize(" ".join(words)) if token in bm25.postings]
+            if column in search_cols and analyzed:
+                candidates = _intersect([list(bm25.postings[token][0]) for token in analyzed])
+            else:
+                candidates = [idx for idx in range(len(store)) if idx not in bm25.removed]
+        values = store.columns[column]
+        return [doc for doc in candidates if _field_contains(values[doc], words)]
+    return _intersect([candidates, docs]) if candidates is not None else docs
+
+
+def _query_top_k(store, bm25, search_cols, parsed, k, allowed=None):
+    """Top k (doc id, score) pairs for a parsed query, best first
+
+    Each AND group intersects its term and phrase posting lists (galloping from
+    the shortest), then checks field atoms on the survivors only, so every extra
+    condition shrinks the work. Matches are ranked by the BM25 score of the
+    query's tokens (0 for documents matched only through non-indexed columns).
+    allowed: sorted doc ids (column filters) every group is intersected with.
+    Exclusion-only queries rank every (allowed) live row without the excluded
+    atoms, in doc id order.
+    """
+    if k <= 0:
+        return []
+    matched = set()
+    if not parsed["groups"] and parsed["exclude"]:
+        matched.update(allowed if allowed is not None else (idx for idx in range(len(store)) if idx not in bm25.removed))
+    for group in parsed["groups"]:
+        lists = [_atom_docs(store, bm25, search_cols, atom) for atom in group if atom[0] != "field"]
+        if allowed is not None:
+            lists.append(allowed)
+        docs = _intersect(lists) if lists else None
+        for atom in group:
+            if atom[0] == "field" and (docs is None or docs):
+                docs = _atom_docs(store, bm25, search_cols, atom, docs)
+        matched.update(docs)
+    candidates = sorted(matched)
+    for atom in parsed["exclude"]:
+        if not candidates:
+            break
+        excluded = set(_atom_docs(store, bm25, search_cols, atom, candidates))
+        candidates = [doc for doc in candidates if doc not in excluded]
+    ranked = bm25.score_docs([(token, 1) for token in parsed["tokens"]], candidates)
+    return heapq.nsmallest(k, ranked, key=lambda pair: (-pair[1], pair[0]))
+
+
+# ============ COLUMN FILTERS ============
+class ColumnBitmaps:
+    """Per-value row bitmaps of a ColumnStore, for exact-match column filters
+
+    A bitmap is a Python int with bit i set when row i holds the value (stripped,
+    case-insensitive); removed rows are never set. A column's bitmaps are built on
+    its first filter, in one pass, so match() costs a few big-int ANDs and ORs
+    however many rows the dataset has.
+    """
+
+    def __init__(self, store, removed=()):
+        # The column lists, not the store: _column_bitmaps() memoizes per store weakly
+        self.values = store.columns
+        self.size = len(store)
+        self.removed = set(removed)
+        self._columns = {}
+
+    def column(self, name):
+        """{value: bitmap} for one column"""
+        bitmaps = self._columns.get(name)
+        if bitmaps is None:
+            values = self.values.get(name, ())
+            width = (self.size + 7) // 8
+            bits = defaultdict(lambda: bytearray(width))
+            for idx in range(len(values)):
+                value = values[idx]
+                if value is not None and idx not in self.removed:
+                    bits[str(value).strip().lower()][idx >> 3] |= 1 << (idx & 7)
+            bitmaps = {value: int.from_bytes(row_bits, "little") for value, row_bits in bits.items()}
+            self._columns[name] = bitmaps
+        return bitmaps
+
+    def match(self, filters):
+        """Bitmap of the rows passing filters: values of one column OR-ed, columns AND-ed"""
+        mask = None
+        for column, values in filters:
+            bitmaps = self.column(column)
+            column_mask = 0
+            for value in values:
+                column_mask |= bitmaps.get(value, 0)
+            mask = column_mask if mask is None else mask & column_mask
+            if not mask:
+                return 0
+        return mask or 0
+
+    def docs(self, filters):
+        """Sorted doc ids passing filters"""
+        data = self.match(filters).to_bytes((self.size + 7) // 8, "little")
+        return [pos * 8 + bit for pos, byte in enumerate(data) if byte for bit in range(8) if byte >> bit & 1]
+
+
+def _normalize_filters(filters, columns):
+    """Canonical ((column, values), ...) for a {column: value or list of values} dict
+
+    Column names match case-insensitively, ignoring spaces and punctuation (like
+    field:value); values are stripped and lowercased. Returns None for no filters
+    and raises ValueError for a column the dataset does not have.
+    """
+    if not filters:
+        return None
+    names = {_field_key(col): col for col in columns}
+    normalized = {}
+    for name, values in filters.items():
+        column = names.get(_field_key(name))
+        if column is None:
+            raise ValueError(f"Unknown filter column: {name}. Available: {', '.join(dict.fromkeys(columns))}")
+        if isinstance(values, str):
+            values = [values]
+        normalized.setdefault(column, set()).update(str(value).strip().lower() for value in values)
+    return tuple(sorted((column, tuple(sorted(values))) for column, values in normalized.items()))
+
+
+_BITMAPS = weakref.WeakKeyDictionary()  # store -> ColumnBitmaps
+_BITMAPS_LOCK = threading.Lock()
+
+
+def _column_bitmaps(store, bm25):
+    """Memoized ColumnBitmaps of the (store, bm25) being ranked
+
+    Keyed by the store object itself, so doc ids always refer to the rows being
+    returned; the bitmaps go away with the store when the CSV changes and the
+    index is reloaded.
+    """
+    with _BITMAPS_LOCK:
+        bitmaps = _BITMAPS.get(store)
+        if bitmaps is None:
+            bitmaps = _BITMAPS[store] = ColumnBitmaps(store, bm25.removed)
+    return bitmaps
+
+
+# ============ SEARCH FUNCTIONS ============
+def _resolve_backend(backend):
+    """Effective search backend for a backend argument (None uses SEARCH_BACKEND)"""
+    backend = backend or SEARCH_BACKEND
+    if backend not in SEARCH_BACKENDS:
+        raise ValueError(f"Unknown search backend: {backend}. Available: {', '.join(SEARCH_BACKENDS)}")
+    if backend == "sqlite":
+        from sqlite_search import fts5_available
+        if not fts5_available():
+            return "bm25"
+    return backend
+
+
+def _rank_queries(filepath, search_cols, output_cols, queries, max_results, backend, fuzzy=False, partial=False,
+                  filters=None):
+    """Uncached result rows for each query on the given backend
+
+    filters: normalized column filters (see _normalize_filters); only rows passing
+    them are scored, and a query without words lists them in file order.
+    """
+    if backend == "sqlite":
+        from sqlite_search import search_file
+        results = search_file(filepath, _dataset_name(filepath), search_cols, output_cols, queries, max_results)
+        _lap("score")
+        return results
+
+    store, bm25 = _load_index(filepath, search_cols, output_cols)
+    allowed = _column_bitmaps(store, bm25).docs(filters) if filters else None
+    _lap("load")
+    ranked_batch = [None] * len(queries)
+    plain = []
+    for i, query in enumerate(queries):
+        parsed = parse_query(query, list(search_cols) + list(output_cols)) if _is_structured(query) else None
+        if parsed is None:
+            plain.append((i, query))
+        elif _is_free_text(parsed):
+            plain.append((i, " ".join(parsed["tokens"])))
+        else:
+            ranked_batch[i] = _query_top_k(store, bm25, search_cols, parsed, max_results, allowed)
+    if allowed is not None:
+        for i, query in plain:
+            tokens = bm25.tokenize(query)
+            if not tokens:
+                ranked_batch[i] = [(doc, 0.0) for doc in allowed[:max(max_results, 0)]]
+                continue
+            terms = bm25.expand(query, fuzzy, partial) if fuzzy or partial else [(token, 1) for token in tokens]
+            ranked_batch[i] = bm25.top_k_within(terms, max_results, allowed)
+    elif fuzzy or partial:
+        for i, query in plain:
+            ranked_batch[i] = bm25.top_k_terms(bm25.expand(query, fuzzy, partial), max_results)
+    elif len(plain) == 1:
+        ranked_batch[plain[0][0]] = bm25.top_k(plain[0][1], max_results)
+    elif plain:
+        for (i, _), ranked in zip(plain, bm25.score_batch([query for _, query in plain], max_results)):
+            ranked_batch[i] = ranked
+    _lap("score")
+    results = [[store.row(idx, output_cols) for idx, score in ranked] for ranked in ranked_batch]
+    _lap("project")
     return results
 
 
+def _search_csv(filepath, search_cols, output_cols, query, max_results, backend=None, fuzzy=False, partial=False,
+                filters=None):
+    """Core search function using BM25 (or the SQLite FTS5 backend)"""
+    return _search_csv_many(filepath, search_cols, output_cols, [query], max_results, backend, fuzzy, partial,
+                            filters)[0]
+
+
+def _search_csv_many(filepath, search_cols, output_cols, queries, max_results, backend=None, fuzzy=False,
+                     partial=False, filters=None):
+    """Batch variant of _search_csv: one index load, all uncached queries scored together"""
+    if not filepath.exists():
+        return [[] for _ in queries]
+    # Query expansion, the query language and column filters need the BM25 index, so they always use the built-in engine
+    if fuzzy or partial or filters or any(_is_structured(query) for query in queries):
+        backend = "bm25"
+    else:
+        backend = _resolve_backend(backend)
+
+    telemetry = _TELEMETRY
+    if telemetry is None:
+        return _search_csv_pending(filepath, search_cols, output_cols, queries, max_results, backend, fuzzy,
+                                   partial, filters)[0]
+    trace = _TRACE.current = _Trace()
+    try:
+        output, pending = _search_csv_pending(filepath, search_cols, output_cols, queries, max_results, backend,
+                                              fuzzy, partial, filters)
+    finally:
+        _TRACE.current = None
+    _record_search(telemetry, trace, filepath, queries, output, pending, backend)
+    return output
+
+
+def _search_csv_pending(filepath, search_cols, output_cols, queries, max_results, backend, fuzzy=False,
+                        partial=False, filters=None):
+    """Results for queries via the result cache and the backend; also returns the uncached positions"""
+    output = [None] * len(queries)
+    if _QUERY_CACHE is not None:
+        fingerprint = _file_fingerprint(filepath)
+        for i, query in enumerate(queries):
+            output[i] = _QUERY_CACHE.get(_query_cache_key(filepath, query, max_results, backend, fuzzy, partial, filters),
+                                         fingerprint)
+        _lap("cache")
+    pending = [i for i, results in enumerate(output) if results is None]
+    if not pending:
+        return output, pending
+
+    # Top results with score > 0
+    ranked = _rank_queries(filepath, search_cols, output_cols, [queries[i] for i in pending], max_results, backend,
+                           fuzzy, partial, filters)
+    for i, results in zip(pending, ranked):
+        output[i] = results
+    if _QUERY_CACHE is not None:
+        for i in pending:
+            _QUERY_CACHE.put(_query_cache_key(filepath, queries[i], max_results, backend, fuzzy, partial, filters),
+                             fingerprint, output[i])
+        _lap("cache")
+    return output, pending
+
+
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
+    return _DOMAIN_MATCHER.best(query, default="style")
 
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "style"
 
+def detect_domain_by_score(query):
+    """Pick the domain whose documents score highest for query in the federated index"""
+    groups = search_all(query, max_results=1, include_stacks=False)["groups"]
+    if not groups:
+        return detect_domain(query)
+    return next(iter(groups))
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+
+def search(query, domain=None, max_results=MAX_RESULTS, by_score=False, backend=None, fuzzy=False, partial=False,
+           filters=None):
+    """Main search function with auto-domain detection
+
+    by_score: when no domain is given, route by federated BM25 score instead of keywords
+    backend: "bm25" or "sqlite" (None uses SEARCH_BACKEND)
+    fuzzy: match misspelled terms to their nearest indexed terms (weighted down; BM25 only)
+    partial: also match indexed terms containing a query term, "morph" -> "Glassmorphism" (weighted down; BM25 only)
+    filters: exact column values rows must have, {"Severity": "High", "Platform": ["Web", "All"]};
+             a list matches any of its values, case is ignored (BM25 only). Rows are
+             filtered before scoring; an empty query lists the matching rows.
+
+    Queries may use the query language (see parse_query): '"dark mode" -neumorphism',
+    'dashboard AND accessible', 'type:dark'. Free text ranks exactly as before.
+    """
     if domain is None:
-        domain = detect_domain(query)
+        domain = detect_domain_by_score(query) if by_score else detect_domain(query)
 
     config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
     filepath = DATA_DIR / config["file"]
@@ -220,7 +1948,13 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    try:
+        filters = _normalize_filters(filters, config["search_cols"] + config["output_cols"])
+    except ValueError as e:
+        return {"error": str(e), "domain": domain}
+
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results, backend, fuzzy,
+                          partial, filters)
 
     return {
         "domain": domain,
@@ -231,8 +1965,8 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     }
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
-    """Search stack-specific guidelines"""
+def search_stack(query, stack, max_results=MAX_RESULTS, backend=None, fuzzy=False, partial=False, filters=None):
+    """Search stack-specific guidelines (fuzzy, partial, filters: see search())"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
 
@@ -241,7 +1975,13 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    try:
+        filters = _normalize_filters(filters, _STACK_COLS["search_cols"] + _STACK_COLS["output_cols"])
+    except ValueError as e:
+        return {"error": str(e), "stack": stack}
+
+    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results, backend,
+                          fuzzy, partial, filters)
 
     return {
         "domain": "stack",
@@ -251,3 +1991,213 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+def search_all(query, max_results=MAX_RESULTS, include_stacks=True, fuzzy=False, partial=False):
+    """Search every domain (and stack) in one scoring pass over the federated index
+
+    Scores share one IDF/length model, so they are comparable across domains; each
+    is normalized by the best score overall. Groups are ordered by their best hit.
+    fuzzy, partial: see search(). Column filters do not apply, the domains' columns differ.
+    """
+    sources, doc_sources, stores, bm25 = _load_federated_index()
+    if fuzzy or partial:
+        ranked = bm25.top_k_terms(bm25.expand(query, fuzzy, partial), bm25.N)
+    else:
+        ranked = bm25.top_k(query, bm25.N)
+
+    groups = {}
+    top_score = None
+    for idx, score in ranked:
+        source_id, row_idx = doc_sources[idx]
+        source = sources[source_id]
+        if source["domain"] == "stack" and not include_stacks:
+            continue
+        if top_score is None:
+            top_score = score
+        group = groups.get(source["key"])
+        if group is None:
+            group = {"domain": source["domain"], "file": source["file"], "score": round(score / top_score, 4),
+                     "count": 0, "scores": [], "results": []}
+            if "stack" in source:
+                group["stack"] = source["stack"]
+            groups[source["key"]] = group
+        if group["count"] >= max_results:
+            continue
+        group["results"].append(stores[source_id].row(row_idx, source["output_cols"]))
+        group["scores"].append(round(score / top_score, 4))
+        group["count"] += 1
+
+    return {
+        "query": query,
+        "count": sum(group["count"] for group in groups.values()),
+        "groups": groups
+    }
+
+
+def search_many(queries, domain=None, max_results=MAX_RESULTS, by_score=False, backend=None, fuzzy=False,
+                partial=False, filters=None):
+    """Batch search: queries are grouped by (detected) domain and each domain index
+    is loaded once. Returns one search()-shaped dict per query, in input order.
+    fuzzy, partial and filters apply to every query (see search())."""
+    queries = list(queries)
+    detect = detect_domain_by_score if by_score else detect_domain
+    groups = defaultdict(list)
+    for i, query in enumerate(queries):
+        groups[domain if domain is not None else detect(query)].append(i)
+
+    output = [None] * len(queries)
+    for group_domain, indices in groups.items():
+        config = CSV_CONFIG.get(group_domain, CSV_CONFIG["style"])
+        filepath = DATA_DIR / config["file"]
+
+        if not filepath.exists():
+            for i in indices:
+                output[i] = {"error": f"File not found: {filepath}", "domain": group_domain}
+            continue
+
+        try:
+            group_filters = _normalize_filters(filters, config["search_cols"] + config["output_cols"])
+        except ValueError as e:
+            for i in indices:
+                output[i] = {"error": str(e), "domain": group_domain}
+            continue
+
+        batch = _search_csv_many(filepath, config["search_cols"], config["output_cols"],
+                                 [queries[i] for i in indices], max_results, backend, fuzzy, partial, group_filters)
+        for i, results in zip(indices, batch):
+            output[i] = {
+                "domain": group_domain,
+                "query": queries[i],
+                "file": config["file"],
+                "count": len(results),
+                "results": results
+            }
+    return output
+
+
+def search_stack_many(queries, stack, max_results=MAX_RESULTS, backend=None, fuzzy=False, partial=False,
+                      filters=None):
+    """Batch variant of search_stack(): the stack index is loaded once for all queries"""
+    queries = list(queries)
+    if stack not in STACK_CONFIG:
+        return [{"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"} for _ in queries]
+
+    filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
+
+    if not filepath.exists():
+        return [{"error": f"Stack file not found: {filepath}", "stack": stack} for _ in queries]
+
+    try:
+        filters = _normalize_filters(filters, _STACK_COLS["search_cols"] + _STACK_COLS["output_cols"])
+    except ValueError as e:
+        return [{"error": str(e), "stack": stack} for _ in queries]
+
+    batch = _search_csv_many(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], queries, max_results,
+                             backend, fuzzy, partial, filters)
+
+    return [{
+        "domain": "stack",
+        "stack": stack,
+        "query": query,
+        "file": STACK_CONFIG[stack]["file"],
+        "count": len(results),
+        "results": results
+    } for query, results in zip(queries, batch)]
+
+
+# ============ AUTOCOMPLETE ============
+class PrefixIndex:
+    """Sorted-array prefix index over analyzed terms and row titles
+
+    terms: (term, document frequency) pairs of the index of domain (None: all);
+    titles: (title, domain) per row.
+    Terms complete on their start, titles on the start of any of their words
+    ("mode" finds "Dark Mode (OLED)"). A prefix is two binary searches into each
+    sorted array; completions are ranked by document frequency (rows carrying a
+    title), titles before terms on ties.
+    """
+
+    def __init__(self, terms, titles, domain=None):
+        self.domain = domain
+        terms = sorted(terms)
+        self.terms = [term for term, _ in terms]
+        self.term_counts = [count for _, count in terms]
+
+        counts = defaultdict(int)
+        for title, domain in titles:
+            if title and title.strip():
+                counts[(title.strip(), domain)] += 1
+        self.titles = list(counts)
+        self.title_counts = list(counts.values())
+        keys = []
+        for title_id, (title, _) in enumerate(self.titles):
+            words = title.lower().split()
+            keys.extend((" ".join(words[i:]), title_id) for i in range(len(words)))
+        keys.sort()
+        self.title_keys = [key for key, _ in keys]
+        self.title_ids = [title_id for _, title_id in keys]
+
+    @staticmethod
+    def _range(keys, prefix):
+        start = bisect_left(keys, prefix)
+        return start, bisect_left(keys, prefix + "\U0010ffff", start)
+
+    def complete(self, prefix, limit=SUGGEST_LIMIT):
+        """Up to limit completions of prefix, most frequent first"""
+        prefix = " ".join(prefix.lower().split())
+        if not prefix or limit <= 0:
+            return []
+        candidates = []
+        start, end = self._range(self.title_keys, prefix)
+        for title_id in {self.title_ids[i] for i in range(start, end)}:
+            title, domain = self.titles[title_id]
+            candidates.append((-self.title_counts[title_id], 0, title.lower(), title, domain))
+        if " " not in prefix:
+            start, end = self._range(self.terms, prefix)
+            candidates.extend((-self.term_counts[i], 1, self.terms[i], self.terms[i], self.domain)
+                              for i in range(start, end))
+        return [{"text": text, "kind": "title" if kind == 0 else "term", "domain": domain, "count": -neg_count}
+                for neg_count, kind, _, text, domain in heapq.nsmallest(limit, candidates)]
+
+
+def _prefix_index(domain):
+    """Memoized PrefixIndex over one domain's index, or over the federated index for None"""
+    if domain is None:
+        sources = _federated_sources()
+        fingerprint = [(source["file"], *_file_fingerprint(DATA_DIR / source["file"])) for source in sources]
+
+        def build():
+            sources, doc_sources, stores, bm25 = _load_federated_index()
+            titles = []
+            for source_id, row_idx in (doc_sources[i] for i in range(len(doc_sources))):
+                source = sources[source_id]
+                col = TITLE_COLS.get(source["domain"])
+                titles.append((stores[source_id].row(row_idx, [col]).get(col), source["key"]))
+            return PrefixIndex(((term, bm25.doc_freqs[term]) for term in bm25.postings), titles)
+    else:
+        config = CSV_CONFIG[domain]
+        filepath = DATA_DIR / config["file"]
+        fingerprint = _file_fingerprint(filepath)
+
+        def build():
+            store, bm25 = _load_index(filepath, config["search_cols"], config["output_cols"])
+            col = TITLE_COLS.get(domain)
+            titles = [(store.row(idx, [col]).get(col), domain) for idx in range(len(store)) if idx not in bm25.removed]
+            return PrefixIndex(((term, bm25.doc_freqs[term]) for term in bm25.postings), titles, domain)
+
+    return _INDEX_REGISTRY.get(("suggest", domain), fingerprint, build)
+
+
+def suggest(prefix, domain=None, limit=SUGGEST_LIMIT):
+    """Autocomplete prefix from the indexed vocabulary and row titles
+
+    domain: a CSV_CONFIG domain, or None for every domain and stack. Returns up to
+    limit {"text", "kind" ("title" or "term"), "domain", "count"} dicts, most
+    frequent first. Uses the persisted indexes; no CSV is read per call.
+    """
+    if domain is not None and domain not in CSV_CONFIG:
+        return [{"error": f"Unknown domain: {domain}. Available: {', '.join(CSV_CONFIG)}"}]
+    if domain is not None and not (DATA_DIR / CSV_CONFIG[domain]["file"]).exists():
+        return []
+    return _prefix_index(domain).complete(prefix, limit)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Search Service - resident daemon that keeps indexes warm
+
+Usage:
+    python search.py --serve [--port 8765]     # start the daemon
+    python search.py "<query>" ...             # uses the daemon when running, else in-process
+
+Protocol: one JSON request per line over a localhost TCP connection, answered with
+one JSON response line. Requests carry an "action" (search, search_stack, search_all,
+search_many, search_stack_many, design_system) plus that action's arguments.
+Clients open with a "hello" handshake and only trust a daemon that answers within
+HANDSHAKE_TIMEOUT with the same PROTOCOL_VERSION and data directory; anything else
+on the port (another program, a daemon of another copy or an older version) makes
+them search in-process.
+
+Any local process (or web page) can reach the port, so the daemon authenticates
+its clients: at start it writes a random token to .index/daemon.token, readable by
+the owner only, and a connection whose first line is not a "hello" carrying that
+token, or that sends a line that is not JSON, is closed unanswered. Requests that
+write files (design_system with persist or output_dir) are never run by the
+daemon; clients run them in-process.
+
+json/socket are imported lazily so that --no-daemon runs don't pay for them.
+"""
+
+import os
+
+# ============ CONFIGURATION ============
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("UI_UX_SEARCH_PORT", "8765"))
+CONNECT_TIMEOUT = 0.2  # seconds; no daemon -> fall back to in-process quickly
+HANDSHAKE_TIMEOUT = 0.5  # seconds; a listener that is not our daemon -> fall back quickly
+REQUEST_TIMEOUT = 60
+PROTOCOL_VERSION = 2  # bump when requests or responses change shape
+TOKEN_FILE = "daemon.token"  # in core.INDEX_DIR, mode 0600, rewritten by every daemon start
+
+
+# ============ REQUEST DISPATCH ============
+class _Warm:
+    """Design system generator shared across requests, reloaded when ui-reasoning.csv changes"""
+    generator = None
+    fingerprint = None
+
+
+def _design_system_generator():
+    from core import DATA_DIR, _file_fingerprint
+    from design_system import DesignSystemGenerator, REASONING_FILE
+
+    filepath = DATA_DIR / REASONING_FILE
+    fingerprint = _file_fingerprint(filepath) if filepath.exists() else None
+    if _Warm.generator is None or _Warm.fingerprint != fingerprint:
+        _Warm.generator = DesignSystemGenerator()
+        _Warm.fingerprint = fingerprint
+    return _Warm.generator
+
+
+def _writes_files(request):
+    """True for requests that write to the file system, which the daemon refuses"""
+    return request.get("action") == "design_system" and bool(request.get("persist") or request.get("output_dir"))
+
+
+def dispatch(request, remote=False):
+    """Execute one request dict in this process and return a JSON-serializable response
+
+    remote: the request came over the daemon socket, so file-writing requests are refused.
+    """
+    import core
+
+    action = request.get("action")
+    if remote and _writes_files(request):
+        raise PermissionError("design_system with persist/output_dir runs in the client process only")
+    max_results = request.get("max_results", core.MAX_RESULTS)
+
+    if action == "hello":
+        return {"protocol": PROTOCOL_VERSION, "data_dir": str(core.DATA_DIR.resolve())}
+    if action == "search":
+        return core.search(request["query"], request.get("domain"), max_results,
+                           by_score=request.get("by_score", False), backend=request.get("backend"),
+                           fuzzy=request.get("fuzzy", False), partial=request.get("partial", False),
+                           filters=request.get("filters"))
+    if action == "search_stack":
+        return core.search_stack(request["query"], request["stack"], max_results, backend=request.get("backend"),
+                                 fuzzy=request.get("fuzzy", False), partial=request.get("partial", False),
+                                 filters=request.get("filters"))
+    if action == "suggest":
+        return core.suggest(request["prefix"], request.get("domain"), request.get("limit", core.SUGGEST_LIMIT))
+    if action == "search_all":
+        return core.search_all(request["query"], max_results, fuzzy=request.get("fuzzy", False),
+                               partial=request.get("partial", False))
+    if action == "search_many":
+        return core.search_many(request["queries"], request.get("domain"), max_results,
+                                by_score=request.get("by_score", False), backend=request.get("backend"),
+                                fuzzy=request.get("fuzzy", False), partial=request.get("partial", False),
+                                filters=request.get("filters"))
+    if action == "search_stack_many":
+        return core.search_stack_many(request["queries"], request["stack"], max_results,
+                                      backend=request.get("backend"), fuzzy=request.get("fuzzy", False),
+                                      partial=request.get("partial", False), filters=request.get("filters"))
+    if action == "design_system":
+        from design_system import generate_design_system
+        return generate_design_system(
+            request["query"],
+            request.get("project_name"),
+            request.get("format", "ascii"),
+            persist=request.get("persist", False),
+            page=request.get("page"),
+            output_dir=request.get("output_dir"),
+            generator=_design_system_generator()
+        )
+    return {"error": f"Unknown action: {action}"}
+
+
+# ============ SERVER ============
+def _warm_up():
+    """Load every domain, stack and federated index plus the design system generator"""
+    import core
+
+    core.prefer_memory_query_cache()
+    for config in core.CSV_CONFIG.values():
+        filepath = core.DATA_DIR / config["file"]
+        if filepath.exists():
+            core._load_index(filepath, config["search_cols"], config["output_cols"])
+    for config in core.STACK_CONFIG.values():
+        filepath = core.DATA_DIR / config["file"]
+        if filepath.exists():
+            core._load_index(filepath, core._STACK_COLS["search_cols"], core._STACK_COLS["output_cols"])
+    core._load_federated_index()
+    _design_system_generator()
+
+
+def _token_path():
+    from core import INDEX_DIR
+    return INDEX_DIR / TOKEN_FILE
+
+
+def _write_token():
+    """Create a fresh owner-only token file and return the token"""
+    import secrets
+    token = secrets.token_hex(32)
+    path = _token_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        path.unlink()  # a new file, so O_CREAT applies the 0600 mode
+    except FileNotFoundError:
+        pass
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token)
+    return token
+
+
+def _read_token():
+    try:
+        return _token_path().read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Run the search daemon until interrupted"""
+    import hmac
+    import json
+    import signal
+    import socketserver
+
+    def parse(line):
+        """Request dict of one line, None when the line is not a JSON object"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return None
+        return request if isinstance(request, dict) else None
+
+    class Handler(socketserver.StreamRequestHandler):
+        def respond(self, response):
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+        def handle(self):
+            self.request.settimeout(HANDSHAKE_TIMEOUT)
+            try:
+                hello = parse(self.rfile.readline())
+            except OSError:
+                return
+            if (hello is None or hello.get("action") != "hello" or not isinstance(hello.get("token"), str)
+                    or not hmac.compare_digest(hello["token"], token)):
+                return  # not an authenticated client: close without answering
+            self.respond({"ok": True, "result": dispatch({"action": "hello"})})
+            self.request.settimeout(None)
+
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                request = parse(line)
+                if request is None:
+                    return
+                try:
+                    response = {"ok": True, "result": dispatch(request, remote=True)}
+                except Exception as e:  # report to the client instead of killing the connection
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                self.respond(response)
+
+    class Server(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    _warm_up()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # stop like Ctrl+C so the token file is removed
+    with Server((host, port), Handler) as server:
+        token = _write_token()  # only once the port is ours: a daemon that failed to bind keeps out of the file
+        print(f"UI Pro Max search service listening on {host}:{port}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if _read_token() == token:
+                _token_path().unlink()
+
+
+# ============ CLIENT ============
+def _exchange(sock, f, request, timeout):
+    """Send one request line and return the parsed response dict (ValueError when it is not one)"""
+    import json
+    sock.settimeout(timeout)
+    sock.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+    response = json.loads(f.readline() or b"null")
+    if not isinstance(response, dict) or not response.get("ok"):
+        raise ValueError("not a search daemon response")
+    return response["result"]
+
+
+def call(request, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Send a request to the daemon; returns (True, result) or (False, None) when no daemon answers"""
+    import socket
+    from core import DATA_DIR
+    token = _read_token()
+    if token is None:
+        return False, None  # no daemon was started for this install
+    try:
+        sock = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT)
+    except OSError:
+        return False, None
+
+    expected = {"protocol": PROTOCOL_VERSION, "data_dir": str(DATA_DIR.resolve())}
+    try:
+        with sock.makefile("rb") as f:
+            if _exchange(sock, f, {"action": "hello", "token": token}, HANDSHAKE_TIMEOUT) != expected:
+                return False, None
+            return True, _exchange(sock, f, request, REQUEST_TIMEOUT)
+    except (OSError, ValueError, KeyError):
+        return False, None
+    finally:
+        sock.close()
+
+
+def run(request, use_daemon=True, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Run a request via the daemon when available, otherwise in-process"""
+    if use_daemon and not _writes_files(request):
+        ok, result = call(request, host, port)
+        if ok:
+            return result
+    return dispatch(request)